@@ -0,0 +1,215 @@
+"""Пакетное распределение вызовов с этажей между лифтами.
+Dispatcher.press_outside_button выбирает лифт для каждого вызова сразу и независимо
+от других вызовов. BatchDispatcher вместо этого накапливает вызовы в течение
+короткого окна (window секунд виртуального времени), объединяет повторные нажатия
+одной кнопки и распределяет накопленные вызовы совместно: назначение с минимальным
+суммарным временем прибытия лифтов (венгерский алгоритм, функция assignment),
+по одному вызову на лифт за раунд. Если вызовов больше, чем лифтов, следующий
+раунд распределяет оставшиеся вызовы с учетом уже назначенных остановок.
+Пока есть необслуженные вызовы, распределение повторяется каждые window секунд:
+вызов передается другому лифту, если тот откроет двери на этаже вызова
+хотя бы на REASSIGN_GAIN секунд раньше с учетом задержки его остановок.
+BatchDispatcher работает только в виртуальном времени (EventLoop).
+"""
+
+import time
+
+from multi_elevator_algorithm import Dispatcher, DOOR_TIME
+
+REASSIGN_GAIN = 5  # Минимальный выигрыш во времени прибытия для передачи вызова другому лифту, секунд
+EXCLUDED = 1e9  # Стоимость назначения вызова лифту, который не может его обслужить
+
+
+def assignment(costs):
+    """Функция решает задачу о назначениях: costs - матрица (список строк) стоимостей.
+    Возвращает список, i-й элемент которого - номер столбца, назначенного строке i,
+    с минимальной суммарной стоимостью. Каждому столбцу назначается не больше одной
+    строки; если строк больше, чем столбцов, части строк назначается None.
+    Венгерский алгоритм с потенциалами, O(n^2 * m)."""
+    n_rows = len(costs)
+    n_cols = len(costs[0]) if n_rows else 0
+    if n_rows > n_cols:
+        transposed = assignment([list(column) for column in zip(*costs)])
+        rows = [None] * n_rows
+        for col, row in enumerate(transposed):
+            rows[row] = col
+        return rows
+    inf = float('inf')
+    # Строки и столбцы нумеруются с 1, нулевой столбец - фиктивный:
+    u = [0.0] * (n_rows + 1)  # Потенциалы строк
+    v = [0.0] * (n_cols + 1)  # Потенциалы столбцов
+    owner = [0] * (n_cols + 1)  # Строка, назначенная столбцу
+    way = [0] * (n_cols + 1)  # Предыдущий столбец на пути увеличения
+    for row in range(1, n_rows + 1):
+        owner[0] = row
+        col0 = 0
+        minv = [inf] * (n_cols + 1)
+        used = [False] * (n_cols + 1)
+        while True:
+            used[col0] = True
+            row0 = owner[col0]
+            cost_row = costs[row0 - 1]
+            delta = inf
+            col1 = 0
+            for col in range(1, n_cols + 1):
+                if not used[col]:
+                    reduced = cost_row[col - 1] - u[row0] - v[col]
+                    if reduced < minv[col]:
+                        minv[col] = reduced
+                        way[col] = col0
+                    if minv[col] < delta:
+                        delta = minv[col]
+                        col1 = col
+            for col in range(n_cols + 1):
+                if used[col]:
+                    u[owner[col]] += delta
+                    v[col] -= delta
+                else:
+                    minv[col] -= delta
+            col0 = col1
+            if owner[col0] == 0:
+                break
+        while col0:  # Чередование назначений вдоль найденного пути
+            col1 = way[col0]
+            owner[col0] = owner[col1]
+            col0 = col1
+    rows = [None] * n_rows
+    for col in range(1, n_cols + 1):
+        if owner[col]:
+            rows[owner[col] - 1] = col - 1
+    return rows
+
+
+class BatchDispatcher(Dispatcher):
+    """Система синхронизации лифтов с пакетным распределением вызовов с этажей."""
+
+    def __init__(self, n_floors, loop, window=1.0, events=None, hooks=(), reassign=True):
+        """При инициализации указываются количество этажей, движок событий и длительность
+        окна накопления вызовов в секундах. Дополнительно - журнал событий, обработчики
+        событий и запрет передачи назначенных вызовов другим лифтам (reassign=False)."""
+        super().__init__(n_floors, events, loop.time, hooks)
+        self.loop = loop
+        self.window = window
+        self.reassign = reassign
+        # Вызов - (этаж, направление, id лифтов, которые могут его обслужить, или None):
+        self.hall_calls = {}  # Вызов -> id лифта, которому передан вызов
+        self.pending = {}  # Вызов -> этаж, куда нужно ехать (или None), в порядке поступления
+        self.scheduled = False  # Запланировано ли распределение накопленных вызовов
+        self.batches = 0  # Количество выполненных распределений
+        self.reassigned = 0  # Количество вызовов, переданных другому лифту
+
+    def press_outside_button(self, floor, speed, destination=None):
+        """Функция запоминает вызов с этажа до ближайшего распределения.
+        Повторное нажатие кнопки, вызов с которой ожидает распределения или уже
+        передан лифту и еще не обслужен, нового вызова не создает. В здании с зонами
+        вызовы, которые могут обслужить разные группы лифтов, не объединяются."""
+        cars = self.eligible(floor, speed, destination)
+        call = (floor, speed, None if cars is None else tuple(cars))
+        obj_id = self.assigned(call)
+        if obj_id is not None:
+            self.elevators[obj_id].press_outside_button(floor, speed)
+            return
+        self.pending.setdefault(call, destination)
+        self.plan()
+
+    def hand_over(self, successor):
+        """Функция передает лифты другой системе синхронизации (см. Dispatcher.hand_over).
+        Накопленные вызовы передаются ей как новые нажатия кнопок, а назначенные
+        вызовы - для пересмотра, если она тоже распределяет вызовы пакетами."""
+        pending = list(self.pending.items())
+        self.pending.clear()
+        if isinstance(successor, BatchDispatcher):
+            successor.hall_calls.update(self.hall_calls)
+            successor.plan()
+        self.hall_calls.clear()
+        super().hand_over(successor)
+        for (floor, speed, _), destination in pending:
+            successor.press_outside_button(floor, speed, destination)
+
+    def assigned(self, call):
+        """Функция возвращает id лифта, которому передан еще не обслуженный вызов call
+        (этаж, направление, лифты, которые могут его обслужить), или None, если такого вызова нет."""
+        obj_id = self.hall_calls.get(call)
+        if obj_id is not None and self.elevators[obj_id].hall_buttons(call[1])[call[0]]:
+            return obj_id
+        return None
+
+    def plan(self):
+        """Функция планирует распределение вызовов через window секунд, если оно еще не запланировано."""
+        if not self.scheduled:
+            self.scheduled = True
+            self.loop.schedule(self.window, self.flush)
+
+    def flush(self):
+        """Функция распределяет накопленные вызовы между лифтами и пересматривает
+        назначение необслуженных вызовов. Пока такие вызовы есть, распределение повторяется."""
+        self.scheduled = False
+        self.batches += 1
+        calls = list(self.pending)
+        self.pending.clear()
+        if calls:
+            self.assign(calls)
+        if self.reassign:
+            self.rebalance()
+        if any(self.assigned(call) is not None for call in self.hall_calls):
+            self.plan()
+
+    def assign(self, calls):
+        """Функция передает вызовы calls лифтам раундами: в каждом раунде каждый лифт
+        получает не больше одного вызова, суммарное время прибытия лифтов минимально.
+        Вызов, которому в раунде не досталось лифта из его группы, ждет следующего раунда."""
+        elevators = self.elevators
+        while calls:
+            start = time.perf_counter()
+            now = self.clock()
+            costs = [[elevator.eta(floor, speed, now) if cars is None or elevator.id in cars else EXCLUDED
+                      for elevator in elevators]
+                     for floor, speed, cars in calls]
+            chosen = assignment(costs)
+            seconds = (time.perf_counter() - start) / len(calls)
+            rest = []
+            for call, obj_id in zip(calls, chosen):
+                floor, speed, cars = call
+                if obj_id is None or cars is not None and obj_id not in cars:
+                    rest.append(call)
+                    continue
+                for hook in self.hooks:
+                    hook.on_dispatch(floor, speed, obj_id, seconds)
+                self.hall_calls[call] = obj_id
+                elevators[obj_id].press_outside_button(floor, speed)
+            calls = rest
+
+    def rebalance(self):
+        """Функция передает необслуженные вызовы другим лифтам. Стоимость передачи вызова
+        лифту - время прибытия лифта на этаж вызова плюс DOOR_TIME секунд за каждую
+        запланированную остановку лифта: новая остановка задержит всех, кто ждет
+        этих остановок. Вызов передается, если стоимость хотя бы на REASSIGN_GAIN секунд
+        меньше времени прибытия лифта, получившего вызов."""
+        elevators = self.elevators
+        now = self.clock()
+        for call, obj_id in list(self.hall_calls.items()):
+            if self.assigned(call) is None:
+                del self.hall_calls[call]
+                continue
+            floor, speed, cars = call
+            current = elevators[obj_id].eta(floor, speed, now)
+            if current < REASSIGN_GAIN:
+                continue
+            best, cost = obj_id, current
+            for other in range(len(elevators)) if cars is None else cars:
+                if other != obj_id:
+                    elevator = elevators[other]
+                    other_cost = elevator.eta(floor, speed, now) + elevator.planned_stops() * DOOR_TIME
+                    if other_cost < cost:
+                        best, cost = other, other_cost
+            if (current - cost >= REASSIGN_GAIN and not self.shared(call, obj_id)
+                    and elevators[obj_id].cancel_outside_button(floor, speed)):
+                self.reassigned += 1
+                self.hall_calls[call] = best
+                elevators[best].press_outside_button(floor, speed)
+
+    def shared(self, call, obj_id):
+        """Функция проверяет, передан ли лифту obj_id другой вызов с той же кнопки этажа
+        (в здании с зонами - для другой группы лифтов): такой вызов снимать нельзя."""
+        return any(other[:2] == call[:2] and other != call and car == obj_id
+                   for other, car in self.hall_calls.items())
@@ -0,0 +1,287 @@
+"""Набор тестов производительности для основных участков алгоритмов.
+Измеряются:
+- скорость выбора лифта для вызова с этажа (Dispatcher.nearest_elevator
+  и Dispatcher.eta) в зависимости от количества лифтов;
+- стоимость проверки кнопок (Elevator.check_buttons) и шага движения лифта
+  (Elevator.step) в зависимости от количества этажей;
+- скорость моделирования в виртуальном времени (моделируемых секунд за секунду)
+  для simple_algorithm.py и multi_elevator_algorithm.py;
+- скорость генерации пассажиров по суточному профилю (traffic.TrafficGenerator)
+  и скорость моделирования рабочего дня с этим пассажиропотоком;
+- суммарная скорость моделирования нескольких зданий в разном количестве
+  процессов (portfolio.Portfolio);
+- пропускная способность потоков управления лифтами при нажатии кнопок
+  из разного количества потоков через потоки управления лифтами (workers.stress_test)
+  и напрямую, когда один лифт изменяют несколько потоков (workers.direct_stress_test).
+Все нагрузки формируются генератором случайных чисел с фиксированным начальным
+значением. Результаты сохраняются в файл JSON, который можно сравнить
+с результатами другой версии кода через параметр --compare.
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+
+import multi_elevator_algorithm as multi
+import portfolio
+import simple_algorithm as simple
+import traffic
+import workers
+from simulation import BuildingConfig, Simulation
+
+SEED = 2024
+REPEAT = 3  # Из нескольких повторов замера берется лучший результат
+
+
+def best_time(function, repeat=REPEAT):
+    """Функция возвращает наименьшее время выполнения функции из нескольких повторов."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def random_fleet(n_floors, n_elevators, rng):
+    """Функция создает систему синхронизации лифтов со случайными
+    положением и направлением движения лифтов; у движущихся лифтов
+    нажаты несколько случайных кнопок."""
+    dispatcher = multi.Dispatcher(n_floors)
+    loop = multi.EventLoop()  # Лифты в виртуальном времени: выбор лифта без снимка состояния
+    for _ in range(n_elevators):
+        multi.Elevator(n_floors, dispatcher, loop)
+    for elevator in dispatcher.elevators:
+        elevator.cur_floor = rng.randint(1, n_floors)
+        elevator.speed = rng.choice([-1, 0, 1])
+        if elevator.speed:
+            press_random_buttons(elevator, rng, 2)
+    return dispatcher
+
+
+def bench_dispatch(fleet_sizes, n_floors=50, n_calls=2000):
+    """Функция измеряет количество решений о выборе лифта в секунду
+    и количество расчетов времени прибытия лифта в секунду."""
+    results = []
+    for n_elevators in fleet_sizes:
+        rng = random.Random(SEED)
+        dispatcher = random_fleet(n_floors, n_elevators, rng)
+        calls = [multi.random_outside_button(n_floors, rng) for _ in range(n_calls)]
+        n_decisions = max(10, n_calls * 16 // max(n_elevators, 16))
+        decisions = calls[:n_decisions]
+
+        def decide():
+            for floor, speed in decisions:
+                dispatcher.nearest_elevator(floor, speed)
+
+        def etas():
+            for floor, speed in decisions:
+                for obj_id in range(n_elevators):
+                    dispatcher.eta(obj_id, floor, speed)
+
+        def decide_batch():
+            dispatcher.nearest_elevators(calls)
+
+        results.append({
+            'n_elevators': n_elevators,
+            'decisions_per_sec': n_decisions / best_time(decide),
+            'batch_decisions_per_sec': n_calls / best_time(decide_batch),
+            'etas_per_sec': n_decisions * n_elevators / best_time(etas),
+        })
+    return results
+
+
+def press_random_buttons(elevator, rng, n_pressed):
+    """Функция нажимает случайные кнопки в кабине и на этажах без запуска движения."""
+    n_floors = elevator.n_floors
+    for _ in range(n_pressed):
+        elevator.inside_buttons[rng.randint(1, n_floors)] = True
+        elevator.outside_buttons_up[rng.randint(1, n_floors - 1)] = True
+        elevator.outside_buttons_down[rng.randint(2, n_floors)] = True
+
+
+def bench_movement(heights, n_steps=20000):
+    """Функция измеряет стоимость проверки кнопок и шага движения лифта
+    в зависимости от количества этажей, микросекунд на вызов."""
+    results = []
+    for n_floors in heights:
+        rng = random.Random(SEED)
+        dispatcher = multi.Dispatcher(n_floors)
+        elevator = multi.Elevator(n_floors, dispatcher)
+        elevator.cur_floor = n_floors // 2
+        elevator.speed = 1
+        press_random_buttons(elevator, rng, 3)
+
+        def check():
+            for _ in range(n_steps):
+                elevator.check_buttons()
+
+        check_time = best_time(check)
+
+        def steps():
+            elevator.moving = True
+            for _ in range(n_steps):
+                if elevator.step() is None:  # Все вызовы обслужены - новые нажатия
+                    press_random_buttons(elevator, rng, 3)
+                    elevator.speed = rng.choice([-1, 1])
+                    elevator.moving = True
+
+        step_time = best_time(steps)
+        results.append({
+            'n_floors': n_floors,
+            'check_buttons_us': check_time / n_steps * 1e6,
+            'step_us': step_time / n_steps * 1e6,
+        })
+    return results
+
+
+def bench_end_to_end(duration=3600):
+    """Функция измеряет скорость моделирования в виртуальном времени,
+    моделируемых секунд за секунду реального времени."""
+    configs = [
+        ('simple_algorithm', 10, 1, lambda: simple.simulate(10, duration, seed=SEED)),
+        ('simple_algorithm', 100, 1, lambda: simple.simulate(100, duration, seed=SEED)),
+        ('multi_elevator_algorithm', 20, 4, lambda: multi.simulate(20, 4, duration, seed=SEED)),
+        ('multi_elevator_algorithm', 50, 50, lambda: multi.simulate(50, 50, duration, seed=SEED)),
+    ]
+    results = []
+    for script, n_floors, n_elevators, run in configs:
+        results.append({
+            'script': script,
+            'n_floors': n_floors,
+            'n_elevators': n_elevators,
+            'duration': duration,
+            'simulated_sec_per_sec': duration / best_time(run, repeat=1),
+        })
+    return results
+
+
+def bench_traffic(peaks, n_floors=50):
+    """Функция измеряет количество пассажиров, генерируемых за секунду по профилю
+    рабочего дня (traffic.office_day), и скорость моделирования этого дня,
+    моделируемых секунд за секунду реального времени."""
+    results = []
+    for peak in peaks:
+        profile = traffic.office_day(n_floors, peak)
+        generator = traffic.TrafficGenerator(n_floors, profile, SEED)
+        n_passengers = len(generator.generate(generator.start, generator.end)[0])
+        generate = best_time(lambda: generator.generate(generator.start, generator.end))
+        config = BuildingConfig(n_floors, max(4, peak // 4))
+        duration = generator.end - generator.start
+        simulate = best_time(lambda: Simulation(config, SEED, profile=profile).run(duration), repeat=1)
+        results.append({
+            'peak_per_minute': peak,
+            'passengers': n_passengers,
+            'generated_per_sec': n_passengers / generate,
+            'simulated_sec_per_sec': duration / simulate,
+        })
+    return results
+
+
+def bench_portfolio(process_counts, n_buildings=8, duration=3600):
+    """Функция измеряет суммарную скорость моделирования n_buildings одинаковых зданий
+    в разном количестве процессов, моделируемых секунд (по всем зданиям) за секунду."""
+    buildings = [portfolio.Building(str(index), BuildingConfig(30, 6, 20), SEED + index)
+                 for index in range(n_buildings)]
+    results = []
+    for processes in process_counts:
+        result = portfolio.Portfolio(buildings, processes).run(duration)
+        results.append({'processes': result['processes'],
+                        'simulated_sec_per_sec': result['simulated_sec_per_sec']})
+    return results
+
+
+def bench_concurrency(thread_counts, n_floors=20, n_elevators=8, n_calls=20000):
+    """Функция измеряет количество нажатий кнопок в секунду при нажатии
+    из разного количества потоков и проверяет, что ни одно нажатие не потеряно."""
+    results = []
+    for n_threads in thread_counts:
+        result = workers.stress_test(n_floors, n_elevators, n_threads,
+                                     n_calls // n_threads, seed=SEED)
+        if result['received'] != result['calls'] or result['pending'] or result['unserved']:
+            raise RuntimeError(f'Потеряны вызовы: {result}')
+        results.append({'threads': n_threads, 'calls_per_sec': result['calls_per_sec']})
+    return results
+
+
+def bench_direct_presses(thread_counts, n_floors=20, n_elevators=2, n_calls=20000):
+    """Функция измеряет количество нажатий кнопок в секунду при нажатии напрямую
+    из разного количества потоков, когда каждый лифт изменяют несколько потоков.
+    Потеря нажатия приводит к исключению (см. workers.direct_stress_test)."""
+    results = []
+    for n_threads in thread_counts:
+        result = workers.direct_stress_test(n_floors, n_elevators, n_threads,
+                                            n_calls // n_threads, seed=SEED)
+        results.append({'threads': n_threads, 'calls_per_sec': result['calls_per_sec']})
+    return results
+
+
+def git_commit():
+    """Функция возвращает хеш текущего коммита или None вне репозитория git."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(quick=False):
+    """Функция выполняет все тесты производительности и возвращает результаты."""
+    fleet_sizes = [1, 4, 16, 64, 256] if quick else [1, 4, 16, 64, 256, 1024, 4096]
+    heights = [10, 100] if quick else [10, 50, 100, 300, 1000]
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': getattr(multi.load_numpy(), '__version__', None),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'dispatch': bench_dispatch(fleet_sizes),
+        'movement': bench_movement(heights),
+        'end_to_end': bench_end_to_end(600 if quick else 3600),
+        'traffic': bench_traffic([10] if quick else [10, 40, 160]),
+        'portfolio': bench_portfolio([1, 2] if quick else [1, 2, 4, 8]),
+        'concurrency': bench_concurrency([1, 4, 16] if quick else [1, 2, 4, 8, 16, 32]),
+        'direct_presses': bench_direct_presses([1, 4, 16] if quick else [1, 2, 4, 8, 16, 32]),
+    }
+
+
+def row_key(row):
+    """Функция возвращает параметры нагрузки строки результатов - ее поля, кроме измерений (float)."""
+    return tuple(sorted((key, value) for key, value in row.items() if not isinstance(value, float)))
+
+
+def compare(old, new):
+    """Функция выводит отношение новых результатов к прежним по каждому показателю.
+    Сравниваются строки с одинаковыми параметрами нагрузки (см. row_key); строки,
+    для которых в прежних результатах нет пары (например, при сравнении полного набора
+    нагрузок с сокращенным), пропускаются."""
+    for section in ('dispatch', 'movement', 'end_to_end', 'traffic', 'portfolio', 'concurrency',
+                    'direct_presses'):
+        old_rows = {row_key(row): row for row in old.get(section, [])}
+        for new_row in new[section]:
+            old_row = old_rows.get(row_key(new_row))
+            if old_row is None:
+                continue
+            label = ', '.join(f'{k}={v}' for k, v in row_key(new_row))
+            for key, value in new_row.items():
+                if isinstance(value, float) and old_row.get(key):
+                    print(f'{section} [{label}] {key}: {value / old_row[key]:.2f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='benchmarks.json', help='файл для сохранения результатов')
+    parser.add_argument('--compare', help='файл с результатами для сравнения')
+    parser.add_argument('--quick', action='store_true', help='сокращенный набор нагрузок')
+    args = parser.parse_args()
+
+    results = run_all(args.quick)
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), results)
@@ -0,0 +1,111 @@
+"""Индексированное хранение состояния кнопок лифта.
+Нажатые кнопки хранятся в виде битовой маски (целого числа), где бит с номером
+этажа установлен, если кнопка этого этажа нажата. Проверки "есть ли вызовы выше
+или ниже этажа" и поиск ближайшего вызова выполняются побитовыми операциями
+без перебора списка этажей, что важно для зданий в сотни этажей.
+Функции count_span, furthest и beyond работают с масками напрямую: по ним
+рассчитывается время прибытия лифта с учетом запланированных остановок.
+Функцией floor_mask в такую же маску записывается зона обслуживания лифта.
+"""
+
+
+class FloorButtons:
+    """Класс для хранения состояния кнопок одного типа на всех этажах.
+    Поддерживает обращение по номеру этажа как к списку:
+    buttons[floor] = True, if buttons[floor]: ..."""
+
+    __slots__ = ('n_floors', 'mask')
+
+    def __init__(self, n_floors):
+        """При инициализации указывается количество этажей в здании.
+        В исходном состоянии ни одна из кнопок не нажата."""
+        self.n_floors = n_floors
+        self.mask = 0
+
+    def __getitem__(self, floor):
+        """Функция проверяет, нажата ли кнопка этажа floor."""
+        return bool(self.mask >> floor & 1)
+
+    def __setitem__(self, floor, pressed):
+        """Функция нажимает или сбрасывает кнопку этажа floor."""
+        if pressed:
+            self.mask |= 1 << floor
+        else:
+            self.mask &= ~(1 << floor)
+
+    def __len__(self):
+        """Размер совпадает с размером списка кнопок, индексируемого номером этажа."""
+        return self.n_floors + 1
+
+    def __iter__(self):
+        """Функция перебирает состояние кнопок всех этажей, начиная с нулевого."""
+        mask = self.mask
+        return (bool(mask >> floor & 1) for floor in range(self.n_floors + 1))
+
+    def any(self):
+        """Функция проверяет, нажата ли хотя бы одна кнопка."""
+        return self.mask != 0
+
+    def count(self):
+        """Функция возвращает количество нажатых кнопок."""
+        return self.mask.bit_count()
+
+    def any_above(self, floor):
+        """Функция проверяет, есть ли нажатые кнопки выше этажа floor."""
+        return self.mask >> (floor + 1) != 0
+
+    def any_below(self, floor):
+        """Функция проверяет, есть ли нажатые кнопки ниже этажа floor."""
+        return self.mask & ((1 << floor) - 1) != 0
+
+    def nearest_above(self, floor):
+        """Функция находит ближайший этаж выше floor с нажатой кнопкой.
+        Возвращает None, если таких этажей нет."""
+        higher = self.mask >> (floor + 1)
+        if not higher:
+            return None
+        return floor + (higher & -higher).bit_length()
+
+    def nearest_below(self, floor):
+        """Функция находит ближайший этаж ниже floor с нажатой кнопкой.
+        Возвращает None, если таких этажей нет."""
+        lower = self.mask & ((1 << floor) - 1)
+        if not lower:
+            return None
+        return lower.bit_length() - 1
+
+
+def floor_mask(floors):
+    """Функция возвращает битовую маску с установленными битами этажей floors."""
+    mask = 0
+    for floor in floors:
+        mask |= 1 << floor
+    return mask
+
+
+def count_span(mask, start, end, direction):
+    """Функция считает нажатые кнопки на этажах от start до end включительно
+    при движении в направлении direction (1 - вверх, -1 - вниз).
+    Если этаж end остался позади этажа start, возвращает 0."""
+    low, high = (start, end) if direction == 1 else (end, start)
+    if low > high:
+        return 0
+    return (mask >> low & ((1 << (high - low + 1)) - 1)).bit_count()
+
+
+def furthest(mask, start, direction):
+    """Функция находит самый дальний этаж с нажатой кнопкой, начиная с этажа start
+    включительно, в направлении direction. Возвращает None, если таких этажей нет."""
+    if direction == 1:
+        higher = mask >> start
+        return start + higher.bit_length() - 1 if higher else None
+    lower = mask & ((1 << (start + 1)) - 1)
+    return (lower & -lower).bit_length() - 1 if lower else None
+
+
+def beyond(mask, floor, direction):
+    """Функция оставляет в маске только кнопки этажей, лежащих за этажом floor
+    в направлении direction."""
+    if direction == 1:
+        return mask >> (floor + 1) << (floor + 1)
+    return mask & ((1 << floor) - 1)
@@ -0,0 +1,57 @@
+"""Движок дискретно-событийного моделирования с виртуальными часами.
+Вместо ожидания через time.sleep события (перемещение лифта между этажами,
+открытие и закрытие дверей, поступление вызовов) помещаются в очередь
+с приоритетом по времени наступления. Обработка очередного события
+мгновенно переводит виртуальные часы на время этого события,
+поэтому сутки работы здания моделируются за несколько секунд.
+"""
+
+import heapq
+
+
+class EventLoop:
+    """Класс для планирования и обработки событий в виртуальном времени."""
+
+    def __init__(self):
+        """Исходное состояние - виртуальное время 0, очередь событий пуста."""
+        self.now = 0.0
+        self.queue = []  # Элементы - (время, порядковый номер, функция, аргументы)
+        self.counter = 0  # Порядковый номер события сохраняет очередность при равном времени
+
+    def time(self):
+        """Функция возвращает текущее виртуальное время."""
+        return self.now
+
+    def call_at(self, when, callback, *args):
+        """Функция планирует вызов функции callback в момент времени when.
+        Вызов, запланированный на прошедший момент, выполняется в текущий момент:
+        виртуальное время не идет назад."""
+        heapq.heappush(self.queue, (max(when, self.now), self.counter, callback, args))
+        self.counter += 1
+
+    def schedule(self, delay, callback, *args):
+        """Функция планирует вызов функции callback через delay секунд."""
+        self.call_at(self.now + delay, callback, *args)
+
+    def step(self):
+        """Функция обрабатывает ближайшее по времени событие.
+        Возвращает False, если очередь событий пуста."""
+        if not self.queue:
+            return False
+        when, _, callback, args = heapq.heappop(self.queue)
+        self.now = when
+        callback(*args)
+        return True
+
+    def run(self, until=None):
+        """Функция обрабатывает события до момента времени until
+        (или до исчерпания очереди, если время не указано).
+        Возвращает количество обработанных событий."""
+        n_events = 0
+        queue = self.queue
+        while queue and (until is None or queue[0][0] <= until):
+            self.step()
+            n_events += 1
+        if until is not None and self.now < until:
+            self.now = until
+        return n_events
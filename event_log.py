@@ -0,0 +1,143 @@
+"""Журнал событий работы лифтов в компактном двоичном формате.
+Каждое событие (нажатие кнопки, прибытие на этаж, открытие и закрытие дверей,
+начало и окончание движения) записывается в файл как запись фиксированной длины
+из 16 байт: время, id лифта, тип события, этаж и направление движения.
+Записи накапливаются в буфере и дописываются в конец файла; файл также можно
+вести через отображение в память (mmap). Запись защищена блокировкой, поэтому
+в журнал можно писать из потоков нескольких лифтов. Функция read_events читает журнал
+обратно в виде генератора для последующего анализа.
+Для вывода тех же событий в консоль в текстовом виде служит класс ConsoleEventLog.
+"""
+
+from collections import namedtuple
+import mmap
+import os
+import struct
+from threading import Lock
+
+# Типы событий:
+CREATED = 0  # Лифт добавлен в систему
+PRESS_INSIDE = 1  # Нажата кнопка в кабине
+PRESS_OUTSIDE = 2  # Нажата кнопка вызова на этаже
+STARTED = 3  # Лифт начал движение
+FLOOR = 4  # Лифт находится на этаже
+DOORS_OPENED = 5  # Двери открылись
+DOORS_CLOSED = 6  # Двери закрылись
+STOPPED = 7  # Лифт остановился, вызовов нет
+CANCELLED = 8  # Вызов с этажа передан другому лифту
+
+RECORD = struct.Struct('<diBhb')  # Время, id лифта, тип события, этаж, направление
+PADDING = bytes(RECORD.size)  # Нули в конце незакрытого журнала, который ведется через mmap
+
+Event = namedtuple('Event', ['time', 'elevator', 'type', 'floor', 'direction'])
+
+directions = {1: 'Up', -1: 'Down', 0: ''}
+
+# Текстовые сообщения о событиях для вывода в консоль:
+MESSAGES = {
+    CREATED: ['Elevator object with id={elevator} created.',
+              'Total number of elevators = {total}'],
+    PRESS_INSIDE: ['Elevator {elevator}: button {floor} pressed inside the cabin.'],
+    PRESS_OUTSIDE: ['Elevator {elevator}: button {direction} on floor {floor} pressed.'],
+    STARTED: ['Elevator {elevator} started moving.'],
+    FLOOR: ['Elevator {elevator} on floor {floor}'],
+    DOORS_OPENED: ['Elevator {elevator}: movement paused.',
+                   'Elevator {elevator}: doors opened.'],
+    DOORS_CLOSED: ['Elevator {elevator}: doors closed.'],
+    STOPPED: ['Elevator {elevator} stopped moving. No buttons pressed.'],
+    CANCELLED: ['Elevator {elevator}: call {direction} on floor {floor} passed to another elevator.'],
+}
+
+
+class EventLog:
+    """Класс для записи событий в двоичный файл."""
+
+    def __init__(self, path, buffer_size=1 << 16, use_mmap=False):
+        """При инициализации указывается путь к файлу журнала (новые записи
+        дописываются в конец файла), размер буфера в байтах и способ записи:
+        через буферизованный файл или через отображение файла в память."""
+        self.path = path
+        self.use_mmap = use_mmap
+        # Лифты в реальном времени пишут в журнал из своих потоков; без блокировки
+        # grow закрывал бы отображение, в которое пишет другой поток:
+        self.lock = Lock()
+        if use_mmap:
+            self.file = open(path, 'a+b')
+            self.size = self.file.seek(0, os.SEEK_END)  # Объем записанных данных
+            self.capacity = self.size
+            self.chunk = max(buffer_size, RECORD.size) // RECORD.size * RECORD.size
+            self.map = None
+            self.grow()
+        else:
+            self.file = open(path, 'ab', buffering=buffer_size)
+
+    def grow(self):
+        """Функция увеличивает размер файла, отображаемого в память."""
+        if self.map is not None:
+            self.map.close()
+        self.capacity += self.chunk
+        self.file.truncate(self.capacity)
+        self.map = mmap.mmap(self.file.fileno(), self.capacity)
+
+    def record(self, time, elevator, event, floor, direction=0):
+        """Функция записывает событие в журнал."""
+        with self.lock:
+            if self.use_mmap:
+                if self.size + RECORD.size > self.capacity:
+                    self.grow()
+                RECORD.pack_into(self.map, self.size, time, elevator, event, floor, direction)
+                self.size += RECORD.size
+            else:
+                self.file.write(RECORD.pack(time, elevator, event, floor, direction))
+
+    def flush(self):
+        """Функция сбрасывает накопленные записи на диск."""
+        with self.lock:
+            if self.use_mmap:
+                self.map.flush()
+            else:
+                self.file.flush()
+
+    def close(self):
+        """Функция сбрасывает накопленные записи и закрывает файл журнала."""
+        with self.lock:
+            if self.use_mmap:
+                self.map.close()
+                self.file.truncate(self.size)  # Неиспользованный запас места отбрасывается
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ConsoleEventLog:
+    """Класс для вывода событий в консоль в текстовом виде."""
+
+    def __init__(self, messages=MESSAGES):
+        """При инициализации можно указать шаблоны сообщений для каждого типа событий."""
+        self.messages = messages
+
+    def record(self, time, elevator, event, floor, direction=0):
+        """Функция выводит сообщение о событии в консоль."""
+        for message in self.messages[event]:
+            print(message.format(elevator=elevator, floor=floor, direction=directions[direction],
+                                 total=elevator + 1, time=time))
+
+
+def read_events(path, chunk_records=4096):
+    """Генератор последовательно читает события из файла журнала.
+    Чтение заканчивается на первой нулевой записи: это незаполненный запас места
+    в конце журнала, который велся через mmap и не был закрыт (у настоящих событий этаж не меньше 1)."""
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(RECORD.size * chunk_records)
+            if not chunk:
+                break
+            usable = len(chunk) - len(chunk) % RECORD.size  # Недописанная запись в конце файла пропускается
+            for offset in range(0, usable, RECORD.size):
+                if chunk[offset:offset + RECORD.size] == PADDING:
+                    return
+                yield Event(*RECORD.unpack_from(chunk, offset))
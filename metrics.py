@@ -0,0 +1,239 @@
+"""Показатели работы лифтов и обработчики событий для их сбора.
+Лифты и система синхронизации сообщают о ключевых моментах своей работы
+(создание лифта, нажатие кнопок, выбор лифта для вызова, передача вызова другому
+лифту, открытие и закрытие дверей, начало и окончание движения, смена направления)
+обработчикам из списка Dispatcher.hooks.
+Если список пуст, сбор показателей почти ничего не стоит.
+Класс PerformanceMetrics собирает по каждому лифту счетчики и гистограммы:
+время ожидания лифта по вызову с этажа, время поездки, количество остановок
+за рейс, время простоя, количество смен направления, а также время,
+затраченное системой синхронизации на выбор лифта.
+"""
+
+import bisect
+
+
+class Hooks:
+    """Базовый класс обработчиков событий. Все функции ничего не делают,
+    в наследниках переопределяются только нужные."""
+
+    def on_created(self, elevator):
+        """Лифт создан и добавлен в систему синхронизации."""
+
+    def on_press_inside(self, elevator, floor):
+        """Нажата кнопка этажа floor в кабине лифта."""
+
+    def on_press_outside(self, elevator, floor, direction):
+        """Вызов с этажа floor в направлении direction передан лифту."""
+
+    def on_dispatch(self, floor, direction, obj_id, seconds):
+        """Для вызова выбран лифт obj_id, выбор занял seconds секунд."""
+
+    def on_cancel(self, elevator, floor, direction):
+        """Необслуженный вызов с этажа floor снят с лифта для передачи другому лифту."""
+
+    def on_start(self, elevator):
+        """Лифт начал движение."""
+
+    def on_stop(self, elevator):
+        """Лифт остановился, вызовов нет."""
+
+    def on_reversal(self, elevator):
+        """Лифт сменил направление движения."""
+
+    def on_doors_opened(self, elevator, buttons):
+        """Двери открылись для обслуживания вызова с кнопок buttons."""
+
+    def on_doors_closed(self, elevator, buttons):
+        """Двери закрылись, вызов с кнопок buttons обслужен."""
+
+
+class Histogram:
+    """Гистограмма значений с границами интервалов, растущими в геометрической прогрессии."""
+
+    def __init__(self, first=0.001, factor=1.25, n_buckets=80):
+        """При инициализации указываются верхняя граница первого интервала,
+        множитель между соседними границами и количество интервалов."""
+        self.bounds = [first * factor ** i for i in range(n_buckets)]
+        self.counts = [0] * (n_buckets + 1)  # Последний интервал - значения больше всех границ
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        """Функция добавляет значение в гистограмму."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def mean(self):
+        """Функция возвращает среднее значение."""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """Функция возвращает верхнюю границу интервала, содержащего q-й процентиль."""
+        if not self.count:
+            return 0.0
+        rank = self.count * q / 100
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[bucket], self.max) if bucket < len(self.bounds) else self.max
+        return self.max
+
+    def merge(self, other):
+        """Функция добавляет значения другой гистограммы с теми же границами."""
+        for bucket, count in enumerate(other.counts):
+            self.counts[bucket] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def summary(self):
+        """Функция возвращает сводные значения гистограммы."""
+        return {'count': self.count, 'mean': self.mean(), 'p50': self.percentile(50),
+                'p95': self.percentile(95), 'max': self.max}
+
+
+class ElevatorStats:
+    """Показатели работы одного лифта."""
+
+    def __init__(self, idle_since=0.0):
+        """При инициализации указывается время, с которого лифт считается простаивающим
+        (None - лифт движется)."""
+        self.hall_wait = Histogram()  # От вызова с этажа до открытия дверей на этом этаже
+        self.ride = Histogram()  # От нажатия кнопки в кабине до открытия дверей на этом этаже
+        self.stops_per_trip = Histogram(first=1, factor=1.5, n_buckets=20)
+        self.trips = 0
+        self.stops = 0
+        self.reversals = 0
+        self.idle_time = 0.0  # Время простоя до начала последнего рейса
+        self.idle_since = idle_since  # Время последней остановки лифта, None - лифт движется
+        self.trip_stops = 0  # Количество остановок в текущем рейсе
+        self.hall_pressed = {}  # (этаж, направление) -> время первого нажатия
+        self.car_pressed = {}  # этаж -> время первого нажатия
+
+    def idle(self, now=None):
+        """Функция возвращает время простоя лифта. Если указан момент now, к нему
+        добавляется текущий простой стоящего лифта (с последней остановки до now)."""
+        if now is None or self.idle_since is None:
+            return self.idle_time
+        return self.idle_time + now - self.idle_since
+
+    def merge(self, other, now=None):
+        """Функция добавляет показатели другого лифта (например, для сводки по всем лифтам).
+        Время простоя другого лифта учитывается на момент now (см. idle)."""
+        self.hall_wait.merge(other.hall_wait)
+        self.ride.merge(other.ride)
+        self.stops_per_trip.merge(other.stops_per_trip)
+        self.trips += other.trips
+        self.stops += other.stops
+        self.reversals += other.reversals
+        self.idle_time += other.idle(now)
+
+    def summary(self, now=None):
+        """Функция возвращает сводные показатели лифта; время простоя - на момент now (см. idle)."""
+        return {'trips': self.trips, 'stops': self.stops, 'reversals': self.reversals,
+                'idle_time': self.idle(now), 'hall_wait': self.hall_wait.summary(),
+                'ride': self.ride.summary(), 'stops_per_trip': self.stops_per_trip.summary()}
+
+
+class PerformanceMetrics(Hooks):
+    """Класс собирает показатели работы каждого лифта и системы синхронизации."""
+
+    def __init__(self, dispatcher):
+        """При инициализации обработчик добавляется в систему синхронизации лифтов."""
+        self.clock = dispatcher.clock
+        self.elevators = {}  # id лифта -> ElevatorStats
+        self.dispatch_time = Histogram(first=1e-7)
+        self.reassigned = {}  # (этаж, направление) -> время нажатия вызова, снятого с лифта
+        for elevator in dispatcher.elevators:
+            self.elevators[elevator.id] = ElevatorStats(self.clock())
+        dispatcher.hooks.append(self)
+
+    def stats(self, elevator):
+        """Функция возвращает показатели лифта, создавая их при первом обращении."""
+        stats = self.elevators.get(elevator.id)
+        if stats is None:
+            stats = self.elevators[elevator.id] = ElevatorStats(self.clock())
+        return stats
+
+    def on_created(self, elevator):
+        self.stats(elevator)
+
+    def on_press_inside(self, elevator, floor):
+        self.stats(elevator).car_pressed.setdefault(floor, self.clock())
+
+    def on_press_outside(self, elevator, floor, direction):
+        call = (floor, direction)
+        # Время ожидания вызова, переданного от другого лифта, считается от первого нажатия:
+        pressed = self.reassigned.pop(call) if call in self.reassigned else self.clock()
+        self.stats(elevator).hall_pressed.setdefault(call, pressed)
+
+    def on_dispatch(self, floor, direction, obj_id, seconds):
+        self.dispatch_time.add(seconds)
+
+    def on_start(self, elevator):
+        stats = self.stats(elevator)
+        stats.idle_time = stats.idle(self.clock())
+        stats.idle_since = None
+        stats.trip_stops = 0
+
+    def on_stop(self, elevator):
+        stats = self.stats(elevator)
+        stats.trips += 1
+        stats.stops_per_trip.add(stats.trip_stops)
+        stats.idle_since = self.clock()
+
+    def on_cancel(self, elevator, floor, direction):
+        call = (floor, direction)
+        pressed = self.stats(elevator).hall_pressed.pop(call, None)
+        if pressed is not None:
+            self.reassigned[call] = pressed
+
+    def on_reversal(self, elevator):
+        self.stats(elevator).reversals += 1
+
+    def on_doors_opened(self, elevator, buttons):
+        stats = self.stats(elevator)
+        stats.stops += 1
+        stats.trip_stops += 1
+        self.served(stats, elevator, buttons, self.clock())
+
+    def on_doors_closed(self, elevator, buttons):
+        # Кнопка, нажатая при открытых дверях, обслужена этой же остановкой:
+        self.served(self.stats(elevator), elevator, buttons, None)
+
+    def served(self, stats, elevator, buttons, now):
+        """Функция учитывает время обслуживания вызова с кнопок buttons на текущем этаже.
+        Если now не указано, вызов считается обслуженным без ожидания."""
+        floor = elevator.cur_floor
+        if buttons is elevator.inside_buttons:
+            pressed = stats.car_pressed.pop(floor, None)
+            histogram = stats.ride
+        else:
+            direction = 1 if buttons is elevator.outside_buttons_up else -1
+            pressed = stats.hall_pressed.pop((floor, direction), None)
+            histogram = stats.hall_wait
+        if pressed is not None:
+            histogram.add(now - pressed if now is not None else 0.0)
+
+    def fleet(self):
+        """Функция возвращает показатели всех лифтов вместе (ElevatorStats).
+        Время простоя стоящих лифтов учитывается по текущий момент."""
+        now = self.clock()
+        fleet = ElevatorStats(None)
+        for stats in self.elevators.values():
+            fleet.merge(stats, now)
+        return fleet
+
+    def summary(self):
+        """Функция возвращает сводные показатели по каждому лифту и по всем лифтам вместе.
+        Время простоя стоящих лифтов учитывается по текущий момент."""
+        now = self.clock()
+        return {'fleet': self.fleet().summary(), 'dispatch_time': self.dispatch_time.summary(),
+                'elevators': {obj_id: stats.summary(now)
+                              for obj_id, stats in sorted(self.elevators.items())}}
@@ -3,117 +3,526 @@
 На каждом этаже для вызова лифта предусмотрены две кнопки со стрелками (вверх и вниз).
 Нажатие кнопок в кабинах лифтов и на этажах имитируют функции со случайным выбором.
 Для синхронизации работы лифтов используется дополнительный класс, отслеживающий
-положение и направление движения лифтов и формирующий приоритетную очередь.
+положение и направление движения лифтов и выбирающий ближайший к вызову лифт.
 Правила движения лифтов:
-- При прочих равных условиях на новый вызов с этажа приезжает ближайший к нему лифт.
+- На новый вызов с этажа приезжает лифт, который раньше других откроет двери
+  на этаже вызова с учетом уже запланированных остановок (1 секунда на этаж,
+  5 секунд на каждое открытие дверей).
 - Для каждого отдельного лифта - пока внутри лифта или на этажах по ходу движения
   есть пассажиры, которым нужно ехать в ту же сторону и чьи вызовы были адресованы
   этому лифту, лифт движется в эту сторону.
 - Если вызовов по ходу движения больше нет, но есть в обратную сторону, лифт меняет направление.
-Алгоритм оптимален при небольшом количестве этажей в здании.
+- Кнопки этажа, нажатые при открытых дверях, обслуживаются повторным открытием дверей.
+Моделирование возможно в реальном времени (каждый лифт и каждое нажатие кнопки
+обрабатываются в отдельном потоке) и в виртуальном времени через движок
+дискретно-событийного моделирования из модуля event_engine.
+При моделировании в реальном времени состояние каждого лифта изменяется
+под его собственной блокировкой, а система синхронизации выбирает лифт
+по согласованному снимку состояния всех лифтов (Dispatcher.snapshot).
+В высотных зданиях лифты можно разделить на зоны: лифт останавливается только
+на этажах своей зоны (зоны разных лифтов могут пересекаться, экспресс-лифт
+проезжает этажи без остановок). Вызов с этажа получает только лифт, зона которого
+включает этаж вызова и этаж, куда нужно ехать; пассажир, которого ни один лифт
+не довезет до этажа назначения, едет с пересадкой на общем этаже зон (sky lobby).
 """
 
-from threading import Thread
-from queue import PriorityQueue
+from threading import Thread, RLock
+from array import array
 import time
 import random
 
-n_floors = int(input('Number of floors:\t'))
-n_elevators = int(input('Number of elevators:\t'))
+from event_engine import EventLoop
+from buttons import FloorButtons, floor_mask, count_span, furthest, beyond
+from event_log import (ConsoleEventLog, CREATED, PRESS_INSIDE, PRESS_OUTSIDE, STARTED, FLOOR,
+                       DOORS_OPENED, DOORS_CLOSED, STOPPED, CANCELLED)
 
-directions = {1: 'Up', -1: 'Down'}
+MOVE_TIME = 1  # Время перемещения лифта на один этаж, секунд
+DOOR_TIME = 5  # Продолжительность остановки лифта на этаже, секунд
+VECTORIZE_FROM = 32  # Количество лифтов, начиная с которого лифты отбираются по векторной оценке
+PRESELECT = 8  # Количество лифтов с наименьшей оценкой, по которым определяется порог отбора
+NO_PLAN = (-1, None)  # План объезда остановок лифта еще не рассчитан (см. Elevator.planned_route)
 
+# NumPy нужен только для векторной оценки времени прибытия лифтов и загружается
+# при первом обращении, чтобы не замедлять импорт модуля (см. load_numpy):
+np = None
 
-class Dispatcher:
-    """Класс для синхронизации работы нескольких лифтов."""
 
-    # id лифта соответствует позиции элемента в списках:
-    elevators_position = []  # Текущий этаж
-    elevators_speed = []  # Скорость и направление движения
+def load_numpy():
+    """Функция загружает NumPy при первом обращении.
+    Возвращает модуль или None, если NumPy не установлен."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        np = numpy
+    return np or None
 
-    def add_object(self):
-        """Функция добавляет сведения о новом лифте в систему синхронизации."""
-        self.elevators_position.append(1)
-        self.elevators_speed.append(0)
 
-    def update_object_position(self, obj_id, pos):
-        """Функция обновляет данные об этаже расположения лифта."""
-        self.elevators_position[obj_id] = pos
-
-    def update_object_speed(self, obj_id, speed):
-        """Функция обновляет данные о направлении движения лифта."""
-        self.elevators_speed[obj_id] = speed
+class Dispatcher:
+    """Класс для синхронизации работы нескольких лифтов."""
 
-    def press_outside_button(self, floor, speed):
+    def __init__(self, n_floors, events=None, clock=time.monotonic, hooks=()):
+        """При инициализации экземпляра класса указывается количество этажей в здании.
+        Дополнительно можно указать журнал событий (например, EventLog или ConsoleEventLog
+        из модуля event_log), функцию, возвращающую текущее время для записей журнала,
+        и обработчики событий для сбора показателей (наследники metrics.Hooks)."""
+        self.n_floors = n_floors
+        self.events = events
+        self.clock = clock
+        self.hooks = list(hooks)
+        self.elevators = []  # Экземпляры класса Elevator
+        self.all_floors = floor_mask(range(1, n_floors + 1))
+        # Лифты разделены на зоны: есть лифты, обслуживающие не все этажи.
+        # Для зданий с зонами запоминаются лифты, которые могут обслужить вызов,
+        # и пути пассажиров с пересадками:
+        self.zoned = False
+        self.eligible_cars = {}  # (этаж, направление, этаж назначения) -> [id лифта]
+        self.routes = {}  # (этаж, этаж назначения) -> этаж, до которого ехать на одном лифте
+        # Единственная копия этажа и направления движения лифтов. id лифта соответствует
+        # позиции элемента в массивах, лифты читают и изменяют свои элементы напрямую:
+        self.elevators_position = array('i')  # Текущий этаж
+        self.elevators_speed = array('i')  # Скорость и направление движения
+        # Версия состояния лифта: нечетная, пока лифт изменяет свое состояние:
+        self.elevators_version = array('I')
+        # Лифты управляются из нескольких потоков (моделирование в реальном времени):
+        self.concurrent = False
+        # Множитель продолжительности действий лифтов в реальном времени (manage_movement,
+        # workers.ElevatorWorker): действие длится duration * time_scale секунд по часам clock.
+        self.time_scale = 1.0
+
+    def add_object(self, elevator, floor=1):
+        """Функция добавляет новый лифт в систему синхронизации: лифт стоит на этаже floor.
+        Возвращает id, присвоенный лифту."""
+        if elevator.zone != self.all_floors:
+            self.zoned = True
+        self.eligible_cars.clear()
+        self.routes.clear()
+        self.elevators.append(elevator)
+        self.elevators_position.append(floor)
+        self.elevators_speed.append(0)
+        self.elevators_version.append(0)
+        return len(self.elevators) - 1
+
+    def snapshot(self):
+        """Функция возвращает согласованные копии массивов этажей и направлений движения
+        лифтов. Массивы копируются без блокировок; если за время копирования лифт
+        изменял свое состояние (его версия нечетная или изменилась), данные этого лифта
+        перечитываются под его блокировкой. Остальные лифты при этом не ждут."""
+        versions = self.elevators_version
+        before = versions[:]
+        positions = self.elevators_position[:]
+        speeds = self.elevators_speed[:]
+        after = versions[:]
+        for obj_id, version in enumerate(before):
+            if version & 1 or version != after[obj_id]:
+                with self.elevators[obj_id].lock:
+                    positions[obj_id] = self.elevators_position[obj_id]
+                    speeds[obj_id] = self.elevators_speed[obj_id]
+        return positions, speeds
+
+    def fleet(self):
+        """Функция возвращает массивы этажей и направлений движения лифтов для выбора
+        лифта: при управлении из нескольких потоков - согласованный снимок,
+        иначе - сами массивы системы синхронизации без копирования."""
+        if self.concurrent:
+            return self.snapshot()
+        return self.elevators_position, self.elevators_speed
+
+    def hand_over(self, successor):
+        """Функция передает лифты другой системе синхронизации successor (например,
+        с другим способом распределения вызовов). Массивы этажей, направлений
+        и версий лифтов передаются без копирования, у этой системы лифтов не остается."""
+        for name in ('elevators', 'elevators_position', 'elevators_speed', 'elevators_version',
+                     'concurrent', 'time_scale', 'zoned', 'eligible_cars', 'routes'):
+            setattr(successor, name, getattr(self, name))
+        for elevator in self.elevators:
+            elevator.dispatcher = successor
+        self.elevators = []
+
+    def press_outside_button(self, floor, speed, destination=None):
         """Функция обрабатывает нажатие кнопки вызора лифта с этажа:
-        находит ближайший к месту вызова лифт и переадресует ему вызов."""
-        queue = PriorityQueue(maxsize=n_elevators)  # Очередь расстояний до всех лифтов
-        distance_to_id = dict()  # Ключи - расстояния, значения - id лифтов
-        for obj_id in range(n_elevators):
-            distance = self.distance(obj_id, floor, speed)
-            queue.put(distance)
-            distance_to_id[distance] = obj_id
-        shortest_distance = queue.get()
-        nearest_elevator = distance_to_id[shortest_distance]
-        elevators_list[nearest_elevator].press_outside_button(floor, speed)
-
-    def distance(self, obj_id, call_floor, call_speed):
-        """Функция находит расстояние от лифта до этажа, с которого поступил вызов."""
-        pos = self.elevators_position[obj_id]
-        speed = self.elevators_speed[obj_id]
-
-        if speed == 0:  # Лифт стоит
-            return abs(call_floor - pos)
-
-        # Лифт движется в том же направлении, что и поступивший вызов
-        if speed == call_speed:
-            if speed == 1:
-                if call_floor >= pos:  # Вверх по направлению к этажу вызова
-                    return call_floor - pos
-                else:  # Уже проехал мимо. В худшем случае лифт доедет до конца, развернется
-                    # и снова может доехать до конца, а уже потом вернется к нужному этажу.
-                    return 2 * n_floors - pos + call_floor
-            elif speed == -1:
-                if call_floor <= pos:  # Вниз по направлению к этажу вызова
-                    return pos - call_floor
-                else:  # Уже проехал мимо
-                    return pos + 2 * n_floors - call_floor
-
-        # Лифт движется в противоположном направлении. В худшем случае он доедет
-        # до последнего в этом направлении этажа и потом вернется к нужному этажу.
+        находит ближайший к месту вызова лифт и переадресует ему вызов.
+        В здании с зонами можно указать этаж, куда нужно ехать (см. eligible)."""
+        self.elevators[self.dispatch(floor, speed, destination)].press_outside_button(floor, speed)
+
+    def dispatch(self, floor, speed, destination=None):
+        """Функция выбирает лифт для вызова с этажа и возвращает его id."""
+        if self.hooks:
+            start = time.perf_counter()
+            obj_id = self.nearest_elevator(floor, speed, destination)
+            seconds = time.perf_counter() - start
+            for hook in self.hooks:
+                hook.on_dispatch(floor, speed, obj_id, seconds)
+        else:
+            obj_id = self.nearest_elevator(floor, speed, destination)
+        return obj_id
+
+    def eligible(self, floor, speed, destination=None):
+        """Функция возвращает список id лифтов, которые могут обслужить вызов с этажа floor
+        в направлении speed: зона лифта включает этаж вызова и этаж destination,
+        а если он не указан - хотя бы один этаж в направлении вызова.
+        Возвращает None, если все лифты обслуживают все этажи.
+        Если вызов не может обслужить ни один лифт, вызывает ValueError."""
+        if not self.zoned:
+            return None
+        key = (floor, speed, destination)
+        cars = self.eligible_cars.get(key)
+        if cars is None:
+            if destination is None:
+                cars = [elevator.id for elevator in self.elevators
+                        if elevator.serves(floor) and beyond(elevator.zone, floor, speed)]
+            else:
+                cars = [elevator.id for elevator in self.elevators
+                        if elevator.serves(floor) and elevator.serves(destination)]
+            if not cars:
+                raise ValueError(f'Вызов с этажа {floor} в направлении {speed} '
+                                 f'не может обслужить ни один лифт')
+            self.eligible_cars[key] = cars
+        return cars
+
+    def serves(self, floor, speed):
+        """Функция проверяет, может ли хотя бы один лифт обслужить вызов с этажа floor
+        в направлении speed."""
+        return any(elevator.serves(floor) and beyond(elevator.zone, floor, speed)
+                   for elevator in self.elevators)
+
+    def route(self, floor, destination):
+        """Функция возвращает этаж, до которого пассажиру с этажа floor нужно доехать
+        на одном лифте по пути к этажу destination: сам этаж назначения, если до него
+        довезет лифт, останавливающийся на этаже floor, иначе - этаж пересадки на пути
+        с наименьшим количеством пересадок. Если пути нет, вызывает ValueError."""
+        if not self.zoned:
+            return destination
+        key = (floor, destination)
+        hop = self.routes.get(key)
+        if hop is None:
+            hop = self.routes[key] = self.find_route(floor, destination)
+        return hop
+
+    def find_route(self, floor, destination):
+        """Функция находит первый этаж пересадки (см. route) поиском в ширину по зонам лифтов."""
+        zones = {elevator.zone for elevator in self.elevators}
+        target = 1 << destination
+        start = 1 << floor
+        previous = {zone: None for zone in zones if zone & start}
+        queue = list(previous)
+        for zone in queue:
+            if zone & target:
+                break
+            for other in zones:
+                if other not in previous and other & zone:
+                    previous[other] = zone
+                    queue.append(other)
         else:
-            if speed == 1:
-                return n_floors - pos + abs(call_floor - pos)
-            else:  # speed = -1
-                return pos + abs(call_floor - pos)
+            raise ValueError(f'С этажа {floor} нельзя доехать до этажа {destination}')
+        if previous[zone] is None:
+            return destination
+        while previous[previous[zone]] is not None:
+            zone = previous[zone]
+        # Из общих этажей первой и второй зон пути выбирается ближайший к этажу назначения:
+        common = previous[zone] & zone
+        return min((hop for hop in range(1, self.n_floors + 1) if common >> hop & 1),
+                   key=lambda hop: abs(destination - hop))
+
+    def press_outside_buttons(self, calls):
+        """Функция обрабатывает пакет нажатий кнопок вызова лифта с этажей.
+        calls - последовательность пар (этаж, направление). Лифты для всех вызовов
+        пакета выбираются по состоянию лифтов до передачи им вызовов пакета."""
+        calls = list(calls)
+        start = time.perf_counter()
+        nearest_elevators = self.nearest_elevators(calls)
+        seconds = (time.perf_counter() - start) / max(len(calls), 1)
+        for (floor, speed), obj_id in zip(calls, nearest_elevators):
+            for hook in self.hooks:
+                hook.on_dispatch(floor, speed, obj_id, seconds)
+            self.elevators[obj_id].press_outside_button(floor, speed)
+
+    def nearest_elevator(self, floor, speed, destination=None):
+        """Функция находит id лифта, который раньше других откроет двери на этаже вызова
+        (см. Elevator.eta). При равном времени выбирается лифт с наименьшим id.
+        В здании с зонами рассматриваются только лифты, которые могут обслужить вызов
+        (см. eligible). В большом парке лифтов при установленном NumPy точное время
+        считается только для лифтов, нижняя оценка времени которых (travel_bounds)
+        не больше лучшего времени среди PRESELECT лифтов с наименьшей оценкой."""
+        eta = self.car_eta(floor, speed, self.clock())
+        cars = self.eligible(floor, speed, destination)
+        if cars is None:
+            cars = range(len(self.elevators))
+        if len(cars) < VECTORIZE_FROM or load_numpy() is None:
+            return min(cars, key=eta)
+        bounds = self.travel_bounds(floor)
+        if self.zoned:  # Лифты, которые не могут обслужить вызов, получают наибольшую оценку
+            excluded = np.ones(len(bounds), dtype=bool)
+            excluded[cars] = False
+            bounds[excluded] = np.iinfo(bounds.dtype).max
+        # Порог - лучшее время среди нескольких лифтов с наименьшей оценкой:
+        threshold = min(map(eta, np.argpartition(bounds, PRESELECT)[:PRESELECT].tolist()))
+        return min(np.flatnonzero(bounds <= threshold).tolist(), key=eta)
+
+    def nearest_elevators(self, calls):
+        """Функция находит id лучшего лифта для каждого вызова из списка calls,
+        состоящего из пар (этаж, направление). Все вызовы распределяются
+        по текущему состоянию лифтов, без учета друг друга. В большом парке лифтов
+        здания без зон при установленном NumPy нижние оценки времени для всех вызовов
+        считаются одной матрицей (вызовы x лифты), а точное время - так же, как
+        в nearest_elevator, только для отобранных по этой матрице лифтов."""
+        calls = list(calls)
+        if not calls or self.zoned or len(self.elevators) < VECTORIZE_FROM or load_numpy() is None:
+            return [self.nearest_elevator(floor, speed) for floor, speed in calls]
+        now = self.clock()
+        floors = np.array([floor for floor, _ in calls], dtype=np.intc)
+        bounds = self.travel_bounds(floors[:, np.newaxis])
+        preselected = np.argpartition(bounds, PRESELECT, axis=1)[:, :PRESELECT].tolist()
+        nearest = []
+        for (floor, speed), row, candidates in zip(calls, bounds, preselected):
+            eta = self.car_eta(floor, speed, now)
+            threshold = min(map(eta, candidates))
+            nearest.append(min(np.flatnonzero(row <= threshold).tolist(), key=eta))
+        return nearest
+
+    def car_eta(self, floor, speed, now):
+        """Функция возвращает функцию, которая по id лифта находит время прибытия
+        лифта на вызов с этажа floor в направлении speed на момент now (см. Elevator.eta)."""
+        if self.concurrent:
+            def eta(obj_id):
+                return self.eta(obj_id, floor, speed, now)
+        else:
+            elevators = self.elevators
+
+            def eta(obj_id):
+                return elevators[obj_id].eta(floor, speed, now)
+        return eta
+
+    def travel_bounds(self, call_floor):
+        """Функция находит нижнюю оценку времени прибытия всех лифтов на этаж вызова
+        (массив NumPy): время переезда без остановок. Лифт, движущийся к этажу вызова,
+        может уже заканчивать перемещение на следующий этаж. Если call_floor - столбец
+        этажей нескольких вызовов, возвращается матрица оценок (вызовы x лифты)."""
+        positions, speeds = self.fleet()
+        pos = np.frombuffer(positions, dtype=np.intc)
+        speed = np.frombuffer(speeds, dtype=np.intc)
+        floors = np.abs(call_floor - pos)
+        return np.where((call_floor - pos) * speed > 0, floors - 1, floors) * MOVE_TIME
+
+    def eta(self, obj_id, call_floor, call_speed, now=None):
+        """Функция находит время в секундах, через которое лифт obj_id откроет двери
+        на этаже вызова (см. Elevator.eta). При управлении лифтами из нескольких потоков
+        расчет повторяется под блокировкой лифта, если лифт изменял свое состояние."""
+        elevator = self.elevators[obj_id]
+        if now is None:
+            now = self.clock()
+        if not self.concurrent:
+            return elevator.eta(call_floor, call_speed, now)
+        versions = self.elevators_version
+        version = versions[obj_id]
+        if not version & 1:
+            eta = elevator.eta(call_floor, call_speed, now)
+            if versions[obj_id] == version:
+                return eta
+        with elevator.lock:
+            return elevator.eta(call_floor, call_speed, now)
+
+
+def route_time(start, speed, call_floor, call_speed, inside, up, down):
+    """Функция находит время движения лифта от этажа start в направлении speed
+    до открытия дверей на этаже call_floor по вызову в направлении call_speed.
+    Лифт объезжает уже запланированные остановки (маски кнопок inside, up и down)
+    по правилам Elevator.step: доезжает в направлении движения до последнего вызова,
+    разворачивается, обслуживает вызовы в обратном направлении и при необходимости
+    разворачивается еще раз. Каждый этаж пути - MOVE_TIME секунд, каждое открытие
+    дверей - DOOR_TIME секунд; двери открываются отдельно для каждой нажатой кнопки
+    этажа, первой - для кнопки в кабине. На этаже start лифт тоже может остановиться."""
+    return plan_time(route_plan(start, speed, inside, up, down), call_floor, call_speed)
+
+
+def route_plan(start, speed, inside, up, down):
+    """Функция рассчитывает не зависящую от вызова часть объезда запланированных
+    остановок (см. route_time): этаж первого разворота, время до открытия дверей на нем
+    и остановки на обратном пути. По плану время прибытия на любой вызов находится
+    функцией plan_time без повторения этих расчетов."""
+    if speed == 0:
+        return start, 0, 0, 0, 0, None, 0, start, 0, 0, 0
+    same = up if speed == 1 else down  # Вызовы с этажей в направлении движения
+    opposite = down if speed == 1 else up
+    # Первый проход в направлении движения до самого дальнего вызова:
+    first_turn = furthest(inside | up | down, start, speed)
+    if first_turn is None:  # Вызовов впереди нет - лифт разворачивается сразу
+        turn_time = back_time = 0
+        turn = start
+    else:
+        before = first_turn - speed
+        turn_time = (abs(first_turn - start) * MOVE_TIME
+                     + (count_span(inside, start, before, speed) + count_span(same, start, before, speed)
+                        + (inside >> first_turn & 1) + (same >> first_turn & 1)) * DOOR_TIME)
+        back_time = turn_time + (opposite >> first_turn & 1) * DOOR_TIME
+        turn = first_turn
+    # Кнопки в кабине, оставшиеся позади лифта, и все остановки, ограничивающие второй проход:
+    back = -speed
+    behind = beyond(inside, start, back)
+    rest = behind | opposite | beyond(same, start, back)
+    return start, speed, inside, same, opposite, first_turn, turn_time, turn, back_time, behind, rest
+
+
+def plan_time(plan, call_floor, call_speed):
+    """Функция находит по плану route_plan время движения лифта до открытия дверей
+    на этаже call_floor по вызову в направлении call_speed (см. route_time)."""
+    start, speed, inside, same, opposite, first_turn, turn_time, turn, elapsed, behind, rest = plan
+    if speed == 0:
+        return abs(call_floor - start) * MOVE_TIME
+    if (call_floor - start) * speed >= 0 and (
+            call_speed == speed or first_turn is None or (call_floor - first_turn) * speed >= 0):
+        # Вызов по ходу движения либо дальше всех остальных (лифт развернется на нем):
+        before = call_floor - speed
+        return (abs(call_floor - start) * MOVE_TIME
+                + (count_span(inside, start, before, speed) + count_span(same, start, before, speed)
+                   + (inside >> call_floor & 1)
+                   + (call_speed != speed and same >> call_floor & 1)) * DOOR_TIME)
+    if call_floor == first_turn:
+        return turn_time
+
+    # Второй проход в обратном направлении: вызовы с этажей в обратном направлении
+    # и кнопки в кабине, оставшиеся позади лифта:
+    back = -speed
+    if call_speed == back:
+        before = call_floor - back
+        return (elapsed + abs(turn - call_floor) * MOVE_TIME
+                + (count_span(behind, turn + back, before, back)
+                   + count_span(opposite, turn + back, before, back)
+                   + (behind >> call_floor & 1)) * DOOR_TIME)
+    bottom = furthest(rest | 1 << call_floor, turn + back, back)
+    before = bottom - back
+    elapsed += (abs(turn - bottom) * MOVE_TIME
+                + (count_span(behind, turn + back, before, back)
+                   + count_span(opposite, turn + back, before, back)
+                   + (behind >> bottom & 1) + (opposite >> bottom & 1)) * DOOR_TIME)
+    if bottom == call_floor:
+        return elapsed
+
+    # Третий проход снова в направлении движения до этажа вызова:
+    return (elapsed + ((same >> bottom & 1) + count_span(same, bottom + speed, call_floor - speed, speed))
+            * DOOR_TIME + abs(call_floor - bottom) * MOVE_TIME)
 
 
 class Elevator:
-    """Класс для управления лифтом."""
-
-    n_elevators = 0  # Счетчик количества экземпляров класса,
-    # служит для присваивания id новым экземплярам класса.
-
-    def __init__(self, n_floors):
-        """При инициализации экземпляра класса указывается количество этажей в здании.
-        Исходное состояние лифта - на уровне 1-го этажа, ни одна из кнопок не нажата."""
+    """Класс для управления лифтом.
+    Этаж и направление движения лифта хранятся только в массивах системы
+    синхронизации (столбцы по всем лифтам), экземпляр обращается к ним по своему id.
+    Остальное состояние - в слотах без словаря атрибутов, что экономит память
+    при моделировании тысяч лифтов.
+    Нажатия кнопок и шаги движения выполняются под блокировкой лифта (locked),
+    поэтому при управлении из нескольких потоков нажатия не теряются,
+    а лифты не ждут друг друга.
+    Зона лифта - битовая маска этажей, на которых лифт останавливается."""
+
+    __slots__ = ('n_floors', 'dispatcher', 'loop', 'moving', 'action', 'serving',
+                 'inside_buttons', 'outside_buttons_up', 'outside_buttons_down',
+                 'id', 'positions', 'speeds', 'versions', 'lock', 'ready_at', 'zone', 'plan')
+
+    def __init__(self, n_floors, dispatcher, loop=None, floors=None):
+        """При инициализации экземпляра класса указывается количество этажей в здании
+        и система синхронизации лифтов. Если указан движок событий loop, движение
+        лифта моделируется в виртуальном времени, иначе - в реальном времени.
+        Если указаны этажи floors, лифт останавливается только на них (зона лифта).
+        Исходное состояние лифта - на уровне нижнего этажа зоны, ни одна из кнопок не нажата."""
         self.n_floors = n_floors
+        self.dispatcher = dispatcher
+        self.loop = loop
         self.moving = False
-        self.cur_floor = 1
-        self.speed = 0
-        self.inside_buttons = [False for _ in range(n_floors + 1)]
-        self.outside_buttons_up = [False for _ in range(n_floors + 1)]
-        self.outside_buttons_down = [False for _ in range(n_floors + 1)]
-        self.id = Elevator.n_elevators
-        Elevator.n_elevators += 1
-        dispatcher.add_object()  # Синхронизация лифтов для распределения вызовов с этажей
-        print(f'Elevator object with id={self.id} created.')
-        print(f'Total number of elevators = {self.n_elevators}')
+        self.action = None  # Начатое и еще не завершенное действие: 'move' или 'doors'
+        self.serving = None  # Кнопки, вызов с которых обслуживается при открытых дверях
+        # Время завершения начатого действия по часам системы синхронизации (с учетом time_scale):
+        self.ready_at = 0.0
+        self.inside_buttons = FloorButtons(n_floors)
+        self.outside_buttons_up = FloorButtons(n_floors)
+        self.outside_buttons_down = FloorButtons(n_floors)
+        self.plan = NO_PLAN  # (версия лифта, план объезда остановок), см. planned_route
+        self.zone = floor_mask(range(1, n_floors + 1) if floors is None else floors)
+        # Синхронизация лифтов для распределения вызовов с этажей:
+        self.id = dispatcher.add_object(self, (self.zone & -self.zone).bit_length() - 1)
+        self.positions = dispatcher.elevators_position
+        self.speeds = dispatcher.elevators_speed
+        self.versions = dispatcher.elevators_version
+        self.lock = RLock()  # Повторно входимая: обработчики событий могут нажимать кнопки лифта
+        if loop is None:  # Лифтом и кнопками управляют отдельные потоки
+            dispatcher.concurrent = True
+        self.record(CREATED, self.cur_floor)
+        for hook in dispatcher.hooks:
+            hook.on_created(self)
+
+    @property
+    def cur_floor(self):
+        """Текущий этаж лифта."""
+        return self.positions[self.id]
+
+    @cur_floor.setter
+    def cur_floor(self, floor):
+        self.positions[self.id] = floor
+
+    @property
+    def speed(self):
+        """Скорость и направление движения лифта: 1 - вверх, -1 - вниз, 0 - стоит."""
+        return self.speeds[self.id]
+
+    @speed.setter
+    def speed(self, speed):
+        self.speeds[self.id] = speed
+
+    def serves(self, floor):
+        """Функция проверяет, останавливается ли лифт на этаже floor."""
+        return bool(self.zone >> floor & 1)
+
+    def __getstate__(self):
+        """Функция возвращает состояние лифта для сохранения в контрольной точке
+        (см. simulation.Simulation.checkpoint): все слоты, кроме блокировки
+        и плана объезда остановок, который рассчитывается заново при первом запросе."""
+        return {name: getattr(self, name) for name in self.__slots__ if name not in ('lock', 'plan')}
+
+    def __setstate__(self, state):
+        """Функция восстанавливает лифт из контрольной точки с новой блокировкой."""
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.lock = RLock()
+        self.plan = NO_PLAN
+
+    def record(self, event, floor, direction=0):
+        """Функция записывает событие в журнал, если он ведется."""
+        events = self.dispatcher.events
+        if events is not None:
+            events.record(self.dispatcher.clock(), self.id, event, floor, direction)
+
+    def locked(self, callback, *args):
+        """Функция вызывает callback под блокировкой лифта и возвращает его результат.
+        На это время версия лифта в системе синхронизации становится нечетной,
+        чтобы снимок состояния лифтов (Dispatcher.snapshot) не прочитал
+        незавершенное изменение."""
+        versions = self.versions
+        obj_id = self.id
+        with self.lock:
+            if versions[obj_id] & 1:  # Вложенный вызов из обработчика событий
+                return callback(*args)
+            versions[obj_id] += 1
+            try:
+                return callback(*args)
+            finally:
+                versions[obj_id] += 1
 
     def press_inside_button(self, floor):
         """Функция обрабатывает нажатие кнопок внутри кабины лифта."""
-        print(f'Elevator {self.id}: button {floor} pressed inside the cabin.')
+        if self.locked(self.add_inside_call, floor):
+            self.manage_movement()
+
+    def add_inside_call(self, floor):
+        """Функция запоминает вызов из кабины и приводит лифт в движение.
+        Возвращает True, если движением в реальном времени должен управлять
+        вызвавший поток (см. start_moving)."""
+        if not self.zone >> floor & 1:  # В кабине нет кнопок этажей вне зоны лифта
+            return False
+        self.record(PRESS_INSIDE, floor)
         self.inside_buttons[floor] = True
+        for hook in self.dispatcher.hooks:
+            hook.on_press_inside(self, floor)
 
         delta = floor - self.cur_floor
         if delta > 0:
@@ -124,169 +533,386 @@ class Elevator:
             speed = 0
 
         self.check_status(speed)
-        self.start_moving()
+        return self.start_moving()
 
     def press_outside_button(self, floor, speed):
         """Функция обрабатывает нажатие кнопок на этажах."""
-        print(f'Elevator {self.id}: button {directions[speed]} on floor {floor} pressed.')
+        if self.locked(self.add_outside_call, floor, speed):
+            self.manage_movement()
+
+    def hall_buttons(self, speed):
+        """Функция возвращает кнопки вызова лифта с этажей в направлении speed."""
+        return self.outside_buttons_up if speed == 1 else self.outside_buttons_down
+
+    def planned_stops(self):
+        """Функция возвращает количество открытий дверей по нажатым кнопкам лифта."""
+        return self.inside_buttons.count() + self.outside_buttons_up.count() + self.outside_buttons_down.count()
+
+    def cancel_outside_button(self, floor, speed):
+        """Функция снимает с лифта необслуженный вызов с этажа для передачи другому лифту.
+        Возвращает False, если вызова нет или лифт уже открыл по нему двери."""
+        return self.locked(self.remove_outside_call, floor, speed)
+
+    def remove_outside_call(self, floor, speed):
+        """Функция снимает вызов с этажа (см. cancel_outside_button) под блокировкой лифта."""
+        buttons = self.hall_buttons(speed)
+        if not buttons[floor] or self.serving is buttons and self.cur_floor == floor:
+            return False
+        buttons[floor] = False
+        self.record(CANCELLED, floor, speed)
+        for hook in self.dispatcher.hooks:
+            hook.on_cancel(self, floor, speed)
+        return True
+
+    def add_outside_call(self, floor, speed):
+        """Функция запоминает вызов с этажа и приводит лифт в движение.
+        Возвращает True, если движением в реальном времени должен управлять
+        вызвавший поток (см. start_moving)."""
+        if not self.zone >> floor & 1:
+            return False
+        self.record(PRESS_OUTSIDE, floor, speed)
 
         if speed == 1:
             self.outside_buttons_up[floor] = True
         elif speed == -1:
             self.outside_buttons_down[floor] = True
+        for hook in self.dispatcher.hooks:
+            hook.on_press_outside(self, floor, speed)
 
         self.check_status(speed)
-        self.start_moving()
+        return self.start_moving()
 
     def start_moving(self):
-        """Функция приводит лифт в движение."""
+        """Функция приводит лифт в движение. В виртуальном времени планирует первый шаг
+        движения. В реальном времени возвращает True: движением управляет поток,
+        нажавший кнопку, после снятия блокировки лифта (manage_movement)."""
         if not self.moving:
             self.moving = True
-            print(f'Elevator {self.id} started moving.')
-            self.manage_movement()
+            self.record(STARTED, self.cur_floor, self.speed)
+            for hook in self.dispatcher.hooks:
+                hook.on_start(self)
+            if self.loop is None:
+                return True
+            self.loop.schedule(0, self.advance)
+        return False
 
     def check_status(self, speed):
         """Функция обновляет скорость (направление) движения
         только для стоящего лифта."""
         if self.speed == 0:
             self.speed = speed
-            dispatcher.update_object_speed(self.id, self.speed)
 
     def manage_movement(self):
-        """Функция управляет остановками и открытием дверей при движении лифта."""
-        while self.moving:
-            print(f'Elevator {self.id} on floor {self.cur_floor}')
-
-            # Если внутри кабины нажата кнопка текущего этажа:
-            if self.inside_buttons[self.cur_floor]:
-                self.activate_doors()
-                self.inside_buttons[self.cur_floor] = False
-            # Если на текущем этаже нажата кнопка "Вверх" при движении лифта наверх:
-            elif self.speed == 1 and self.outside_buttons_up[self.cur_floor]:
-                self.activate_doors()
-                self.outside_buttons_up[self.cur_floor] = False
-            # Если на текущем этаже нажата кнопка "Вниз" при движении лифта вниз:
-            elif self.speed == -1 and self.outside_buttons_down[self.cur_floor]:
-                self.activate_doors()
-                self.outside_buttons_down[self.cur_floor] = False
-            # Стоявший лифт вызван с этажа для движения в противоположном направлении:
-            elif sum(self.inside_buttons) == 0:
-                if sum(self.outside_buttons_up) == 0 and self.outside_buttons_down[self.cur_floor]:
-                    self.activate_doors()
-                    self.outside_buttons_down[self.cur_floor] = False
-                elif sum(self.outside_buttons_down) == 0 and self.outside_buttons_up[self.cur_floor]:
-                    self.activate_doors()
-                    self.outside_buttons_up[self.cur_floor] = False
-
-            self.check_buttons()
+        """Функция управляет остановками и открытием дверей при движении лифта
+        в реальном времени. Управление заканчивается, когда лифт остановился:
+        следующее нажатие кнопки снова приведет лифт в движение в своем потоке.
+        Паузы умножаются на Dispatcher.time_scale."""
+        duration = self.step()
+        while duration is not None:
+            time.sleep(duration * self.dispatcher.time_scale)
+            duration = self.step()
+
+    def advance(self):
+        """Функция выполняет очередной шаг движения лифта в виртуальном времени
+        и планирует следующий шаг после его завершения."""
+        duration = self.step()
+        if duration is not None:
+            self.loop.schedule(duration, self.advance)
+
+    def step(self):
+        """Функция завершает начатое действие лифта и начинает следующее.
+        Возвращает продолжительность нового действия в секундах
+        или None, если лифт остановился."""
+        return self.locked(self.next_action)
+
+    def next_action(self):
+        """Функция выполняет шаг движения лифта (см. step) под блокировкой лифта."""
+        # Этаж и направление читаются из массивов системы синхронизации один раз за шаг:
+        if self.action == 'doors':
+            # Кнопки текущего этажа, нажатые при открытых дверях, проверяются
+            # так же, как при прибытии на этаж: при необходимости двери откроются снова.
+            self.close_doors()
+            floor = self.cur_floor
+            speed = self.speed
+        else:
+            if self.action == 'move':
+                self.arrive()
+            floor = self.cur_floor
+            speed = self.speed
+            self.record(FLOOR, floor, speed)
+
+        # Если внутри кабины нажата кнопка текущего этажа:
+        if self.inside_buttons[floor]:
+            return self.activate_doors(self.inside_buttons)
+        # Если на текущем этаже нажата кнопка "Вверх" при движении лифта наверх:
+        elif speed == 1 and self.outside_buttons_up[floor]:
+            return self.activate_doors(self.outside_buttons_up)
+        # Если на текущем этаже нажата кнопка "Вниз" при движении лифта вниз:
+        elif speed == -1 and self.outside_buttons_down[floor]:
+            return self.activate_doors(self.outside_buttons_down)
+        # Вызовов по ходу движения больше нет, а на текущем этаже ждут движения в обратную сторону:
+        elif speed == 1 and self.outside_buttons_down[floor] and not self.calls_above():
+            self.change_direction(-1)
+            return self.activate_doors(self.outside_buttons_down)
+        elif speed == -1 and self.outside_buttons_up[floor] and not self.calls_below():
+            self.change_direction(1)
+            return self.activate_doors(self.outside_buttons_up)
+
+        return self.check_buttons()
+
+    def eta(self, call_floor, call_speed, now):
+        """Функция находит время в секундах, через которое лифт откроет двери на этаже
+        call_floor по вызову в направлении call_speed, если вызов будет передан лифту:
+        остаток начатого действия (перемещения или остановки) и время объезда
+        уже запланированных остановок по плану лифта (см. planned_route и plan_time)."""
+        remaining = 0.0
+        if self.action is not None and self.ready_at > now:
+            # Остаток действия по часам системы синхронизации переводится в секунды модели:
+            scale = self.dispatcher.time_scale
+            remaining = min((self.ready_at - now) / scale, DOOR_TIME) if scale else 0.0
+        return remaining + plan_time(self.planned_route(), call_floor, call_speed)
+
+    def planned_route(self):
+        """Функция возвращает план объезда запланированных остановок лифта (см. route_plan).
+        План обновляется только после изменения состояния лифта - нажатия кнопки,
+        обслуживания вызова или шага движения (при этом меняется версия лифта
+        в системе синхронизации), поэтому все вызовы с этажей между изменениями
+        используют один и тот же план. Пока лифт изменяет свое состояние
+        (версия нечетная), план рассчитывается, но не запоминается."""
+        version = self.versions[self.id]
+        plan = self.plan  # Версия и план читаются вместе, одной ссылкой
+        if plan[0] == version:
+            return plan[1]
+        pos = self.cur_floor
+        speed = self.speed
+        action = self.action
+        inside = self.inside_buttons.mask
+        up = self.outside_buttons_up.mask
+        down = self.outside_buttons_down.mask
+        if action == 'move':  # Лифт примет решение на следующем этаже
+            pos += speed
+        elif action == 'doors':  # Обслуживаемый вызов будет сброшен при закрытии дверей
+            served = ~(1 << pos)
+            if self.serving is self.inside_buttons:
+                inside &= served
+            elif self.serving is self.outside_buttons_up:
+                up &= served
+            else:
+                down &= served
+        route = route_plan(pos, speed, inside, up, down)
+        if not version & 1:
+            self.plan = (version, route)
+        return route
+
+    def calls_above(self):
+        """Функция проверяет, есть ли вызовы выше текущего этажа."""
+        return (self.inside_buttons.any_above(self.cur_floor)
+                or self.outside_buttons_up.any_above(self.cur_floor)
+                or self.outside_buttons_down.any_above(self.cur_floor))
+
+    def calls_below(self):
+        """Функция проверяет, есть ли вызовы ниже текущего этажа."""
+        return (self.inside_buttons.any_below(self.cur_floor)
+                or self.outside_buttons_up.any_below(self.cur_floor)
+                or self.outside_buttons_down.any_below(self.cur_floor))
 
     def check_buttons(self):
         """Функция проверяет состояние всех кнопок в кабине и на этажах,
-        изменяет скорость (направление) движения и позицию лифта."""
+        изменяет скорость (направление) движения и позицию лифта.
+        Возвращает продолжительность перемещения или None при остановке."""
 
-        inside_higher = sum(self.inside_buttons[self.cur_floor+1:])
-        inside_lower = sum(self.inside_buttons[:self.cur_floor])
+        # Проверки выполняются по битовым маскам без перебора этажей. Кнопки нажимаются
+        # только на этажах зоны лифта, поэтому проверяется только зона лифта:
+        floor = self.cur_floor
+        speed = self.speed
+        inside_higher = self.inside_buttons.any_above(floor)
+        inside_lower = self.inside_buttons.any_below(floor)
 
-        outside_higher_up = sum(self.outside_buttons_up[self.cur_floor+1:])
-        outside_lower_up = sum(self.outside_buttons_up[:self.cur_floor])
-        outside_higher_down = sum(self.outside_buttons_down[self.cur_floor+1:])
-        outside_lower_down = sum(self.outside_buttons_down[:self.cur_floor])
+        outside_higher_up = self.outside_buttons_up.any_above(floor)
+        outside_lower_up = self.outside_buttons_up.any_below(floor)
+        outside_higher_down = self.outside_buttons_down.any_above(floor)
+        outside_lower_down = self.outside_buttons_down.any_below(floor)
 
         # Проверка кнопок при движении вверх:
-        if self.speed == 1:
+        if speed == 1:
             # Кнопки по ходу движения вверх в порядке приоритетности:
-            if inside_higher > 0 or outside_higher_up > 0 or outside_higher_down > 0:
+            if inside_higher or outside_higher_up or outside_higher_down:
                 stop_movement = False
             # Кнопки ниже текущего этажа в любом направлении:
-            elif inside_lower > 0 or outside_lower_up > 0 or outside_lower_down > 0:
-                self.speed = -1
+            elif inside_lower or outside_lower_up or outside_lower_down:
+                self.change_direction(-1)
                 stop_movement = False
             else:  # Нет нажатых кнопок:
                 stop_movement = True
 
         # Проверка кнопок при движении вниз:
-        elif self.speed == -1:
+        elif speed == -1:
             # Кнопки по ходу движения вниз в порядке приоритетности:
-            if inside_lower > 0 or outside_lower_down > 0 or outside_lower_up > 0:
+            if inside_lower or outside_lower_down or outside_lower_up:
                 stop_movement = False
             # Кнопки выше текущего этажа в любом направлении:
-            elif inside_higher > 0 or outside_higher_up > 0 or outside_higher_down > 0:
-                self.speed = 1
+            elif inside_higher or outside_higher_up or outside_higher_down:
+                self.change_direction(1)
                 stop_movement = False
             else:  # Нет нажатых кнопок:
                 stop_movement = True
 
         # Случай, когда повторно нажата кнопка текущего этажа после остановки лифта:
+        # Лифт с нулевой скоростью останется на том же этаже, но двери откроются.
+        # Если вызов с текущего этажа уже обслужен, лифт останавливается.
         else:
-            stop_movement = False  # Лифт с нулевой скоростью останется на том же этаже, но двери откроются.
+            stop_movement = not self.inside_buttons[floor]
 
         if stop_movement:
-            self.stop()
+            return self.stop()
         else:
-            self.move()
+            return self.move()
+
+    def change_direction(self, speed):
+        """Функция меняет направление движения лифта на противоположное."""
+        self.speed = speed
+        for hook in self.dispatcher.hooks:
+            hook.on_reversal(self)
 
     def move(self):
-        """Функция перемещает лифт на следующий этаж по ходу движения.
+        """Функция начинает перемещение лифта на следующий этаж по ходу движения.
         Скорость движения лифта - 1 этаж в секунду."""
-        time.sleep(1)
-        self.cur_floor += self.speed
-        dispatcher.update_object_position(self.id, self.cur_floor)
+        self.action = 'move'
+        self.ready_at = self.dispatcher.clock() + MOVE_TIME * self.dispatcher.time_scale
+        return MOVE_TIME
+
+    def arrive(self):
+        """Функция завершает перемещение лифта на следующий этаж."""
+        self.action = None
+        self.positions[self.id] += self.speeds[self.id]
 
     def stop(self):
         """Функция остановливает движение лифта при отсутствии вызовов."""
         self.speed = 0
         self.moving = False
-        dispatcher.update_object_speed(self.id, self.speed)
-        print(f'Elevator {self.id} stopped moving. No buttons pressed.')
-
-    def activate_doors(self):
-        """Функция для открытия и закрытия дверей при остановке лифта на этаже.
-        Продолжительность остановки - 5 секунд."""
-        print(f'Elevator {self.id}: movement paused.')
-        print(f'Elevator {self.id}: doors opened.')
-        time.sleep(5)
-        print(f'Elevator {self.id}: doors closed.')
-
-
-def random_inside_calls(n_floors):
+        self.record(STOPPED, self.cur_floor)
+        for hook in self.dispatcher.hooks:
+            hook.on_stop(self)
+
+    def activate_doors(self, buttons):
+        """Функция открывает двери при остановке лифта на этаже для обслуживания
+        вызова с кнопок buttons. Продолжительность остановки - 5 секунд."""
+        self.record(DOORS_OPENED, self.cur_floor, self.speed)
+        for hook in self.dispatcher.hooks:
+            hook.on_doors_opened(self, buttons)
+        self.action = 'doors'
+        self.serving = buttons
+        self.ready_at = self.dispatcher.clock() + DOOR_TIME * self.dispatcher.time_scale
+        return DOOR_TIME
+
+    def close_doors(self):
+        """Функция закрывает двери и сбрасывает обслуженный вызов."""
+        self.record(DOORS_CLOSED, self.cur_floor, self.speed)
+        buttons = self.serving
+        buttons[self.cur_floor] = False
+        self.action = None
+        self.serving = None
+        for hook in self.dispatcher.hooks:
+            hook.on_doors_closed(self, buttons)
+
+
+def random_outside_button(n_floors, rng=random):
+    """Функция выбирает случайный этаж и направление вызова лифта."""
+    floor = rng.randint(1, n_floors)
+    if floor == 1:
+        direction = 1
+    elif floor == n_floors:
+        direction = -1
+    else:
+        direction = rng.choice([1, -1])
+    return floor, direction
+
+
+def random_inside_calls(dispatcher):
     """Функция имитирует нажатие кнопок в кабинах лифтов пассажирами.
     Нажатие случайной кнопки происходит каждые 2-3 секунды."""
     print('Random function for buttons inside cabins started.')
     while True:
         time_gap = random.randint(2, 3)
         time.sleep(time_gap)
-        elevator = random.randint(0, n_elevators - 1)
-        floor = random.randint(1, n_floors)
-        Thread(target=elevators_list[elevator].press_inside_button, args=(floor,)).start()
+        elevator = random.choice(dispatcher.elevators)
+        floor = random.randint(1, dispatcher.n_floors)
+        Thread(target=elevator.press_inside_button, args=(floor,)).start()
 
 
-def random_outside_calls(n_floors):
+def random_outside_calls(dispatcher):
     """Функция имитирует нажатие кнопок вызова лифта пассажирами на этажах.
     Нажатие случайной кнопки происходит каждые 2-3 секунды."""
     print('Random function for outside buttons started.')
     while True:
         time_gap = random.randint(2, 3)
         time.sleep(time_gap)
-        floor = random.randint(1, n_floors)
-        if floor == 1:
-            direction = 1
-        elif floor == n_floors:
-            direction = -1
-        else:
-            direction = random.choice([1, -1])
+        floor, direction = random_outside_button(dispatcher.n_floors)
         Thread(target=dispatcher.press_outside_button, args=(floor, direction)).start()
 
 
-# Синхронизация работы лифтов:
-dispatcher = Dispatcher()
-
-# Инициализация указанного количества лифтов:
-elevators_list = []
-for _ in range(n_elevators):
-    elevators_list.append(Elevator(n_floors))
-
-# Генерация нажатий кнопок внутри кабины всех лифтов:
-Thread(target=random_inside_calls, args=(n_floors,)).start()
-
-# Генерация нажатий кнопок на этажах:
-Thread(target=random_outside_calls, args=(n_floors,)).start()
+class RandomCalls:
+    """Класс имитирует нажатие кнопок в кабинах и на этажах в виртуальном времени.
+    Нажатие случайной кнопки каждого типа происходит каждые 2-3 секунды."""
+
+    def __init__(self, dispatcher, loop, rng=random):
+        """При инициализации указываются система синхронизации лифтов,
+        движок событий и генератор случайных чисел."""
+        self.dispatcher = dispatcher
+        self.loop = loop
+        self.rng = rng
+
+    def start(self):
+        """Функция планирует первые нажатия кнопок."""
+        self.loop.schedule(self.rng.randint(2, 3), self.inside_call)
+        self.loop.schedule(self.rng.randint(2, 3), self.outside_call)
+
+    def inside_call(self):
+        """Функция нажимает случайную кнопку в кабине случайного лифта."""
+        elevator = self.rng.choice(self.dispatcher.elevators)
+        elevator.press_inside_button(self.rng.randint(1, self.dispatcher.n_floors))
+        self.loop.schedule(self.rng.randint(2, 3), self.inside_call)
+
+    def outside_call(self):
+        """Функция нажимает случайную кнопку вызова лифта на этаже.
+        В здании с зонами кнопки, вызов с которых не обслуживает ни один лифт, не нажимаются."""
+        floor, direction = random_outside_button(self.dispatcher.n_floors, self.rng)
+        if self.dispatcher.serves(floor, direction):
+            self.dispatcher.press_outside_button(floor, direction)
+        self.loop.schedule(self.rng.randint(2, 3), self.outside_call)
+
+
+def simulate(n_floors, n_elevators, duration, seed=None, events=None):
+    """Функция моделирует работу лифтов в виртуальном времени
+    в течение duration секунд и возвращает систему синхронизации лифтов.
+    События записываются в журнал events с отметками виртуального времени."""
+    loop = EventLoop()
+    dispatcher = Dispatcher(n_floors, events, loop.time)
+    for _ in range(n_elevators):
+        Elevator(n_floors, dispatcher, loop)
+    RandomCalls(dispatcher, loop, random.Random(seed)).start()
+    loop.run(until=duration)
+    return dispatcher
+
+
+if __name__ == '__main__':
+    n_floors = int(input('Number of floors:\t'))
+    n_elevators = int(input('Number of elevators:\t'))
+    duration = input('Simulated time, seconds (Enter - real time):\t')
+
+    if duration:
+        # Моделирование в виртуальном времени:
+        simulate(n_floors, n_elevators, float(duration), events=ConsoleEventLog())
+    else:
+        # Синхронизация работы лифтов:
+        dispatcher = Dispatcher(n_floors, ConsoleEventLog())
+
+        # Инициализация указанного количества лифтов:
+        for _ in range(n_elevators):
+            Elevator(n_floors, dispatcher)
+
+        # Генерация нажатий кнопок внутри кабины всех лифтов:
+        Thread(target=random_inside_calls, args=(dispatcher,)).start()
+
+        # Генерация нажатий кнопок на этажах:
+        Thread(target=random_outside_calls, args=(dispatcher,)).start()
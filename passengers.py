@@ -0,0 +1,123 @@
+"""Модель пассажиропотока для оценки работы лифтов.
+Пассажиры появляются на этажах в случайные моменты времени (пуассоновский поток),
+нажимают кнопку вызова лифта в нужном направлении, садятся в лифт, который открыл
+двери по этому вызову, нажимают в кабине кнопку этажа назначения и выходят
+при открытии дверей на этом этаже. По ходу моделирования собираются время ожидания
+лифта, время поездки (от появления пассажира до выхода из лифта) и количество остановок.
+В здании с зонами пассажир, которого ни один лифт не довезет до этажа назначения,
+едет до этажа пересадки (Dispatcher.route), снова вызывает лифт и ждет его;
+время ожидания пассажира складывается из ожидания на всех этажах пересадок.
+Моделирование выполняется в виртуальном времени через движок из модуля event_engine.
+"""
+
+from collections import defaultdict
+import statistics
+
+from metrics import Hooks
+
+
+class PassengerTraffic(Hooks):
+    """Класс моделирует пассажиропоток и собирает показатели работы лифтов.
+    Об открытии и закрытии дверей лифтов класс узнает как обработчик событий
+    системы синхронизации лифтов (Dispatcher.hooks)."""
+
+    def __init__(self, dispatcher, loop, arrivals_per_minute, rng):
+        """При инициализации указываются система синхронизации лифтов, движок событий,
+        средняя интенсивность появления пассажиров и генератор случайных чисел.
+        Обработчик добавляется в систему синхронизации лифтов."""
+        self.dispatcher = dispatcher
+        self.loop = loop
+        self.rate = arrivals_per_minute / 60  # Пассажиров в секунду
+        self.rng = rng
+        # (этаж, направление) -> [(время появления, этаж назначения, время вызова лифта,
+        # время ожидания на предыдущих этажах пересадок)]:
+        self.waiting = defaultdict(list)
+        # id лифта -> этаж выхода -> [(время появления, этаж назначения, время ожидания)]:
+        self.riding = {}
+        self.doors_opened_at = {}  # id лифта -> время открытия дверей
+        self.wait_times = []
+        self.trip_times = []
+        self.stops = defaultdict(int)  # id лифта -> количество остановок
+        dispatcher.hooks.append(self)
+
+    def start(self):
+        """Функция планирует появление первого пассажира."""
+        self.loop.schedule(self.rng.expovariate(self.rate), self.arrival)
+
+    def arrival(self):
+        """Функция создает пассажира на случайном этаже и вызывает для него лифт."""
+        n_floors = self.dispatcher.n_floors
+        origin = self.rng.randint(1, n_floors)
+        destination = self.rng.randint(1, n_floors - 1)
+        if destination >= origin:  # Этаж назначения отличается от этажа появления
+            destination += 1
+        self.call(origin, destination, self.loop.now, 0.0)
+        self.loop.schedule(self.rng.expovariate(self.rate), self.arrival)
+
+    def call(self, floor, destination, arrived, waited):
+        """Функция вызывает лифт для пассажира на этаже floor: до этажа назначения
+        или до этажа пересадки на пути к нему."""
+        hop = self.dispatcher.route(floor, destination)
+        direction = 1 if hop > floor else -1
+        self.waiting[(floor, direction)].append((arrived, destination, self.loop.now, waited))
+        self.dispatcher.press_outside_button(floor, direction, hop)
+
+    def on_doors_opened(self, elevator, buttons):
+        """Функция высаживает пассажиров, доехавших до этажа назначения
+        или до этажа пересадки."""
+        self.stops[elevator.id] += 1
+        self.doors_opened_at[elevator.id] = self.loop.now
+        if buttons is elevator.inside_buttons:
+            floor = elevator.cur_floor
+            for arrived, destination, waited in self.riding.get(elevator.id, {}).pop(floor, ()):
+                if floor == destination:
+                    self.trip_times.append(self.loop.now - arrived)
+                else:
+                    self.call(floor, destination, arrived, waited)
+
+    def on_doors_closed(self, elevator, buttons):
+        """Функция сажает в лифт пассажиров, ожидавших его на этаже
+        для движения в обслуженном направлении, если лифт останавливается
+        на этаже, куда им нужно ехать."""
+        if buttons is elevator.outside_buttons_up:
+            direction = 1
+        elif buttons is elevator.outside_buttons_down:
+            direction = -1
+        else:
+            return
+        opened = self.doors_opened_at[elevator.id]
+        floor = elevator.cur_floor
+        staying = []
+        for passenger in self.waiting.pop((floor, direction), ()):
+            arrived, destination, called, waited = passenger
+            hop = self.dispatcher.route(floor, destination)
+            if not elevator.serves(hop):  # Пассажир ждет лифта другой зоны
+                staying.append(passenger)
+                continue
+            waited += max(0.0, opened - called)
+            if hop == destination:
+                self.wait_times.append(waited)
+            self.riding.setdefault(elevator.id, {}).setdefault(hop, []).append((arrived, destination, waited))
+            elevator.press_inside_button(hop)
+        if staying:
+            self.waiting[(floor, direction)] = staying
+
+    def summary(self):
+        """Функция возвращает сводные показатели работы лифтов."""
+        n_elevators = len(self.dispatcher.elevators)
+        return {
+            'passengers': len(self.trip_times),
+            'mean_wait': statistics.fmean(self.wait_times) if self.wait_times else 0.0,
+            'p95_wait': percentile(self.wait_times, 95),
+            'mean_trip': statistics.fmean(self.trip_times) if self.trip_times else 0.0,
+            'stops_per_car': sum(self.stops.values()) / n_elevators,
+        }
+
+
+def percentile(values, q):
+    """Функция находит q-й процентиль значений (ближайший ранг)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, -(-len(ordered) * q // 100) - 1)
+    return ordered[int(rank)]
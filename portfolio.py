@@ -0,0 +1,235 @@
+"""Моделирование нескольких зданий в нескольких процессах.
+Каждая модель (simulation.Simulation) хранит все свое состояние в экземпляре,
+но в одном процессе модели выполняются по очереди. Класс Portfolio делит здания
+на группы (шарды) с примерно одинаковым количеством лифтов и моделирует каждую
+группу в отдельном процессе, поэтому суммарная скорость моделирования растет
+с количеством ядер процессора.
+Процессы моделируют свои здания отрезками по slice_seconds секунд виртуального
+времени и после каждого отрезка записывают текущие показатели каждого здания
+(время модели, количество событий, количество и суммарное время ожидания и поездок
+пассажиров) в общую память (multiprocessing.shared_memory). Показатели можно читать
+во время моделирования (Portfolio.snapshot), не останавливая процессы и не пересылая
+сообщений. Каждое здание записывается только своим процессом; пока процесс
+обновляет строку здания, ее версия нечетная, и чтение повторяется.
+В конце показатели работы лифтов всех зданий (metrics.PerformanceMetrics)
+объединяются, а журналы событий зданий сливаются в один журнал, упорядоченный
+по времени, со сквозной нумерацией лифтов (функция merge_logs).
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from multiprocessing import shared_memory
+import heapq
+import os
+import time
+
+from event_log import EventLog, read_events
+from metrics import ElevatorStats
+from passengers import PassengerTraffic
+from simulation import Simulation
+
+# Здание: название, описание (BuildingConfig), начальное значение генератора случайных чисел
+# и дополнительные параметры Simulation (batch_window, profile, profile_start):
+Building = namedtuple('Building', ['name', 'config', 'seed', 'options'], defaults=(None, None))
+
+# Поля строки здания в общей памяти:
+FIELDS = ['version', 'time', 'events', 'boarded', 'wait_total', 'delivered', 'trip_total']
+VERSION, TIME, EVENTS, BOARDED, WAIT_TOTAL, DELIVERED, TRIP_TOTAL = range(len(FIELDS))
+
+
+def shard(buildings, n_shards):
+    """Функция делит здания на n_shards групп с примерно одинаковым суммарным
+    количеством лифтов (каждое следующее по количеству лифтов здание - в наименее
+    загруженную группу). Возвращает списки номеров зданий."""
+    shards = [[] for _ in range(n_shards)]
+    loads = [(0, number) for number in range(n_shards)]
+    order = sorted(range(len(buildings)), key=lambda index: -buildings[index].config.n_elevators)
+    for index in order:
+        load, number = heapq.heappop(loads)
+        shards[number].append(index)
+        heapq.heappush(loads, (load + buildings[index].config.n_elevators, number))
+    return [sorted(indexes) for indexes in shards if indexes]
+
+
+def log_path(log_dir, index):
+    """Функция возвращает путь к журналу событий здания index."""
+    return os.path.join(log_dir, f'building-{index:04d}.bin')
+
+
+def publish(table, index, simulation, events, sums):
+    """Функция записывает текущие показатели здания index в общую память table.
+    sums - [количество учтенных ожиданий, количество учтенных поездок, сумма ожиданий,
+    сумма поездок]: новые значения добавляются к суммам, а не суммируются заново."""
+    traffic = simulation.traffic
+    if isinstance(traffic, PassengerTraffic):
+        for value in traffic.wait_times[sums[0]:]:
+            sums[2] += value
+        for value in traffic.trip_times[sums[1]:]:
+            sums[3] += value
+        sums[0] = len(traffic.wait_times)
+        sums[1] = len(traffic.trip_times)
+    row = index * len(FIELDS)
+    table[row + VERSION] += 1  # Нечетная версия - строка обновляется
+    table[row + TIME] = simulation.now
+    table[row + EVENTS] = events
+    table[row + BOARDED] = sums[0]
+    table[row + WAIT_TOTAL] = sums[2]
+    table[row + DELIVERED] = sums[1]
+    table[row + TRIP_TOTAL] = sums[3]
+    table[row + VERSION] += 1
+
+
+def run_shard(memory_name, buildings, duration, slice_seconds, log_dir, metrics):
+    """Функция выполняется в отдельном процессе: моделирует здания buildings
+    (пары номер здания, Building) в течение duration секунд и возвращает для каждого
+    здания номер, сводные показатели Simulation.summary и показатели всех его лифтов
+    вместе (ElevatorStats или None, если их сбор не включен)."""
+    memory = shared_memory.SharedMemory(memory_name)
+    table = memory.buf.cast('d')
+    models = []
+    try:
+        for index, building in buildings:
+            events = EventLog(log_path(log_dir, index)) if log_dir else None
+            simulation = Simulation(building.config, building.seed, events=events, metrics=metrics,
+                                    **(building.options or {}))
+            models.append((index, simulation, events, [0, 0, 0.0, 0.0], [0]))
+        until = 0.0
+        while until < duration:
+            until = min(until + slice_seconds, duration)
+            for index, simulation, _, sums, counter in models:
+                counter[0] += simulation.run_until(until)
+                publish(table, index, simulation, counter[0], sums)
+        results = []
+        for index, simulation, events, _, _ in models:
+            fleet = simulation.metrics.fleet() if simulation.metrics is not None else None
+            results.append((index, simulation.summary(), fleet))
+        return results
+    finally:
+        for _, _, events, _, _ in models:
+            if events is not None:
+                events.close()
+        table.release()
+        memory.close()
+
+
+def merge_logs(paths, output, offsets):
+    """Функция сливает журналы событий paths в один журнал output, упорядоченный
+    по времени. К id лифтов из журнала paths[i] прибавляется offsets[i]."""
+    def shifted(path, offset):
+        for event in read_events(path):
+            yield event._replace(elevator=event.elevator + offset)
+
+    count = 0
+    with EventLog(output) as log:
+        streams = [shifted(path, offset) for path, offset in zip(paths, offsets)]
+        for event in heapq.merge(*streams, key=lambda event: event.time):
+            log.record(*event)
+            count += 1
+    return count
+
+
+class Portfolio:
+    """Класс моделирует несколько зданий одновременно в нескольких процессах."""
+
+    def __init__(self, buildings, processes=None):
+        """При инициализации указываются здания (список Building) и количество
+        процессов (по умолчанию - по числу ядер процессора, но не больше количества зданий)."""
+        self.buildings = list(buildings)
+        if not self.buildings:
+            raise ValueError('Не указано ни одного здания')
+        self.processes = min(processes or os.cpu_count() or 1, len(self.buildings))
+        # Сквозной id первого лифта каждого здания в общем журнале событий:
+        self.offsets = []
+        total = 0
+        for building in self.buildings:
+            self.offsets.append(total)
+            total += building.config.n_elevators
+        self.memory = None
+        self.table = None
+
+    def run(self, duration, slice_seconds=60.0, log_dir=None, metrics=False,
+            progress=None, progress_interval=1.0):
+        """Функция моделирует работу лифтов всех зданий в течение duration секунд
+        виртуального времени. Если указан каталог log_dir, события каждого здания
+        записываются в свой журнал, а в конце сливаются в журнал portfolio.bin.
+        С параметром metrics=True собираются показатели работы лифтов. Функция progress,
+        если указана, вызывается каждые progress_interval секунд реального времени
+        с результатом snapshot. Возвращает сводные показатели каждого здания и всех зданий вместе."""
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            # Журналы дописываются в конец файла, поэтому журналы прежнего запуска удаляются:
+            for path in [log_path(log_dir, index) for index in range(len(self.buildings))] + \
+                    [os.path.join(log_dir, 'portfolio.bin')]:
+                if os.path.exists(path):
+                    os.remove(path)
+        started = time.perf_counter()
+        self.memory = shared_memory.SharedMemory(create=True, size=8 * len(FIELDS) * len(self.buildings))
+        self.table = self.memory.buf.cast('d')
+        try:
+            for position in range(len(self.table)):
+                self.table[position] = 0.0
+            shards = shard(self.buildings, self.processes)
+            with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+                futures = [pool.submit(run_shard, self.memory.name,
+                                       [(index, self.buildings[index]) for index in indexes],
+                                       duration, slice_seconds, log_dir, metrics)
+                           for indexes in shards]
+                while True:
+                    done, pending = wait(futures, progress_interval, FIRST_EXCEPTION)
+                    if progress is not None:
+                        progress(self.snapshot())
+                    if not pending or any(future.exception() for future in done):
+                        break
+                shard_results = [future.result() for future in futures]
+            totals = self.snapshot()
+        finally:
+            self.table.release()
+            self.table = None
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
+        elapsed = time.perf_counter() - started
+
+        summaries = [None] * len(self.buildings)
+        fleet = ElevatorStats() if metrics else None
+        for results in shard_results:
+            for index, summary, stats in results:
+                summaries[index] = summary
+                if fleet is not None:
+                    fleet.merge(stats)
+        result = {
+            'buildings': [{'name': building.name, **summary}
+                          for building, summary in zip(self.buildings, summaries)],
+            'total': totals['total'],
+            'metrics': fleet.summary() if fleet is not None else None,
+            'processes': len(shards),
+            'wall_time': elapsed,
+            'simulated_sec_per_sec': duration * len(self.buildings) / elapsed,
+        }
+        if log_dir:
+            paths = [log_path(log_dir, index) for index in range(len(self.buildings))]
+            result['log'] = os.path.join(log_dir, 'portfolio.bin')
+            result['log_events'] = merge_logs(paths, result['log'], self.offsets)
+        return result
+
+    def snapshot(self):
+        """Функция читает текущие показатели зданий из общей памяти (во время моделирования -
+        на конец последнего отрезка, смоделированного каждым зданием). Возвращает словарь:
+        buildings - показатели каждого здания, total - суммы по всем зданиям."""
+        table = self.table
+        width = len(FIELDS)
+        rows = []
+        for index in range(len(self.buildings)):
+            row = index * width
+            while True:
+                version = table[row + VERSION]
+                values = table[row:row + width].tolist()
+                if version % 2 == 0 and table[row + VERSION] == version:
+                    break
+            rows.append(dict(zip(FIELDS[1:], values[1:])))
+        total = {field: sum(row[field] for row in rows) for field in FIELDS[1:]}
+        total['time'] = min(row['time'] for row in rows)  # Время, до которого смоделированы все здания
+        for stats in rows + [total]:
+            stats['mean_wait'] = stats['wait_total'] / stats['boarded'] if stats['boarded'] else 0.0
+            stats['mean_trip'] = stats['trip_total'] / stats['delivered'] if stats['delivered'] else 0.0
+        return {'buildings': rows, 'total': total}
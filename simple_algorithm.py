@@ -6,67 +6,113 @@
 - Пока внутри лифта или на этажах по ходу движения есть пассажиры,
   которым нужно ехать в ту же сторону, лифт движется в эту сторону.
 - Если вызовов по ходу движения больше нет, но есть в обратную сторону, лифт меняет направление.
+- Кнопки этажа, нажатые при открытых дверях, обслуживаются повторным открытием дверей.
+Моделирование возможно в реальном времени и в виртуальном времени
+через движок дискретно-событийного моделирования из модуля event_engine.
+Нажатия кнопок и шаги движения выполняются под блокировкой лифта,
+поэтому нажатия из разных потоков не теряются.
 Алгоритм оптимален при небольшом количестве этажей и наличии одного лифта в здании.
 """
 
-from threading import Thread
+from threading import Thread, Lock
 import time
 import random
 
-n_floors = int(input('Number of floors:\t'))
+from event_engine import EventLoop
+from buttons import FloorButtons
+from event_log import (ConsoleEventLog, PRESS_INSIDE, PRESS_OUTSIDE, STARTED, FLOOR,
+                       DOORS_OPENED, DOORS_CLOSED, STOPPED)
 
-directions = {1: 'Up', -1: 'Down'}
+# Текстовые сообщения о событиях для вывода в консоль:
+MESSAGES = {
+    PRESS_INSIDE: ['Button {floor} pressed inside the cabin.'],
+    PRESS_OUTSIDE: ['Button {direction} on floor {floor} pressed.'],
+    STARTED: ['Started moving.'],
+    FLOOR: ['Floor: {floor}'],
+    DOORS_OPENED: ['Movement paused.', 'Doors opened.'],
+    DOORS_CLOSED: ['Doors closed.'],
+    STOPPED: ['Stopped moving. No buttons pressed.'],
+}
+
+MOVE_TIME = 1  # Время перемещения лифта на один этаж, секунд
+DOOR_TIME = 5  # Продолжительность остановки лифта на этаже, секунд
 
 
 class Elevator:
     """Класс для управления лифтом."""
 
-    def __init__(self, n_floors):
+    def __init__(self, n_floors, loop=None, events=None, clock=time.monotonic):
         """При инициализации экземпляра класса указывается количество этажей в здании.
+        Если указан движок событий loop, движение лифта моделируется
+        в виртуальном времени, иначе - в реальном времени.
+        Дополнительно можно указать журнал событий (например, EventLog или ConsoleEventLog
+        из модуля event_log) и функцию, возвращающую текущее время для записей журнала.
         В исходном состоянии ни одна из кнопок внутри кабины и на этажах не нажата.
         Исходное состояние лифта - на уровне 1-го этажа."""
         self.n_floors = n_floors
+        self.loop = loop
+        self.events = events
+        self.clock = clock
         self.moving = False
         self.cur_floor = 1
         self.speed = 0
-        self.inside_buttons = [False for _ in range(n_floors + 1)]
-        self.outside_buttons_up = [False for _ in range(n_floors + 1)]
-        self.outside_buttons_down = [False for _ in range(n_floors + 1)]
+        self.action = None  # Начатое и еще не завершенное действие: 'move' или 'doors'
+        self.serving = None  # Кнопки, вызов с которых обслуживается при открытых дверях
+        self.inside_buttons = FloorButtons(n_floors)
+        self.outside_buttons_up = FloorButtons(n_floors)
+        self.outside_buttons_down = FloorButtons(n_floors)
+        self.lock = Lock()  # Нажатия кнопок и шаги движения из разных потоков
+
+    def record(self, event, floor, direction=0):
+        """Функция записывает событие в журнал, если он ведется."""
+        if self.events is not None:
+            self.events.record(self.clock(), 0, event, floor, direction)
 
     def press_inside_button(self, floor):
         """Функция обрабатывает нажатие кнопок внутри кабины лифта."""
-        print(f'Button {floor} pressed inside the cabin.')
-        self.inside_buttons[floor] = True
-
-        delta = floor - self.cur_floor
-        if delta > 0:
-            speed = 1
-        elif delta < 0:
-            speed = -1
-        else:
-            speed = 0
+        with self.lock:
+            self.record(PRESS_INSIDE, floor)
+            self.inside_buttons[floor] = True
+
+            delta = floor - self.cur_floor
+            if delta > 0:
+                speed = 1
+            elif delta < 0:
+                speed = -1
+            else:
+                speed = 0
 
-        self.check_status(speed)
-        self.start_moving()
+            self.check_status(speed)
+            start = self.start_moving()
+        if start:
+            self.manage_movement()
 
     def press_outside_button(self, floor, speed):
         """Функция обрабатывает нажатие кнопок на этажах."""
-        print(f'Button {directions[speed]} on floor {floor} pressed.')
+        with self.lock:
+            self.record(PRESS_OUTSIDE, floor, speed)
 
-        if speed == 1:
-            self.outside_buttons_up[floor] = True
-        elif speed == -1:
-            self.outside_buttons_down[floor] = True
+            if speed == 1:
+                self.outside_buttons_up[floor] = True
+            elif speed == -1:
+                self.outside_buttons_down[floor] = True
 
-        self.check_status(speed)
-        self.start_moving()
+            self.check_status(speed)
+            start = self.start_moving()
+        if start:
+            self.manage_movement()
 
     def start_moving(self):
-        """Функция приводит лифт в движение."""
+        """Функция приводит лифт в движение. В виртуальном времени планирует первый шаг
+        движения. В реальном времени возвращает True: движением управляет поток,
+        нажавший кнопку, после снятия блокировки лифта (manage_movement)."""
         if not self.moving:
             self.moving = True
-            print('Started moving.')
-            self.manage_movement()
+            self.record(STARTED, self.cur_floor, self.speed)
+            if self.loop is None:
+                return True
+            self.loop.schedule(0, self.advance)
+        return False
 
     def check_status(self, speed):
         """Функция обновляет скорость (направление) движения
@@ -75,52 +121,91 @@ class Elevator:
             self.speed = speed
 
     def manage_movement(self):
-        """Функция управляет остановками и открытием дверей при движении лифта."""
-        while self.moving:
-            print(f'Floor: {self.cur_floor}')
-
-            # Если внутри кабины нажата кнопка текущего этажа:
-            if self.inside_buttons[self.cur_floor]:
-                self.activate_doors()
-                self.inside_buttons[self.cur_floor] = False
-            # Если на текущем этаже нажата кнопка "Вверх" при движении лифта наверх:
-            elif self.speed == 1 and self.outside_buttons_up[self.cur_floor]:
-                self.activate_doors()
-                self.outside_buttons_up[self.cur_floor] = False
-            # Если на текущем этаже нажата кнопка "Вниз" при движении лифта вниз:
-            elif self.speed == -1 and self.outside_buttons_down[self.cur_floor]:
-                self.activate_doors()
-                self.outside_buttons_down[self.cur_floor] = False
-            # Стоявший лифт вызван с этажа для движения в противоположном направлении:
-            elif sum(self.inside_buttons) == 0:
-                if sum(self.outside_buttons_up) == 0 and self.outside_buttons_down[self.cur_floor]:
-                    self.activate_doors()
-                    self.outside_buttons_down[self.cur_floor] = False
-                elif sum(self.outside_buttons_down) == 0 and self.outside_buttons_up[self.cur_floor]:
-                    self.activate_doors()
-                    self.outside_buttons_up[self.cur_floor] = False
-
-            self.check_buttons()
+        """Функция управляет остановками и открытием дверей при движении лифта
+        в реальном времени. Управление заканчивается, когда лифт остановился:
+        следующее нажатие кнопки снова приведет лифт в движение в своем потоке."""
+        duration = self.step()
+        while duration is not None:
+            time.sleep(duration)
+            duration = self.step()
+
+    def advance(self):
+        """Функция выполняет очередной шаг движения лифта в виртуальном времени
+        и планирует следующий шаг после его завершения."""
+        duration = self.step()
+        if duration is not None:
+            self.loop.schedule(duration, self.advance)
+
+    def step(self):
+        """Функция завершает начатое действие лифта и начинает следующее.
+        Возвращает продолжительность нового действия в секундах
+        или None, если лифт остановился."""
+        with self.lock:
+            return self.next_action()
+
+    def next_action(self):
+        """Функция выполняет шаг движения лифта (см. step) под блокировкой лифта."""
+        if self.action == 'doors':
+            # Кнопки текущего этажа, нажатые при открытых дверях, проверяются
+            # так же, как при прибытии на этаж: при необходимости двери откроются снова.
+            self.close_doors()
+        else:
+            if self.action == 'move':
+                self.arrive()
+            self.record(FLOOR, self.cur_floor, self.speed)
+
+        # Если внутри кабины нажата кнопка текущего этажа:
+        if self.inside_buttons[self.cur_floor]:
+            return self.activate_doors(self.inside_buttons)
+        # Если на текущем этаже нажата кнопка "Вверх" при движении лифта наверх:
+        elif self.speed == 1 and self.outside_buttons_up[self.cur_floor]:
+            return self.activate_doors(self.outside_buttons_up)
+        # Если на текущем этаже нажата кнопка "Вниз" при движении лифта вниз:
+        elif self.speed == -1 and self.outside_buttons_down[self.cur_floor]:
+            return self.activate_doors(self.outside_buttons_down)
+        # Вызовов по ходу движения больше нет, а на текущем этаже ждут движения в обратную сторону:
+        elif self.speed == 1 and self.outside_buttons_down[self.cur_floor] and not self.calls_above():
+            self.speed = -1
+            return self.activate_doors(self.outside_buttons_down)
+        elif self.speed == -1 and self.outside_buttons_up[self.cur_floor] and not self.calls_below():
+            self.speed = 1
+            return self.activate_doors(self.outside_buttons_up)
+
+        return self.check_buttons()
+
+    def calls_above(self):
+        """Функция проверяет, есть ли вызовы выше текущего этажа."""
+        return (self.inside_buttons.any_above(self.cur_floor)
+                or self.outside_buttons_up.any_above(self.cur_floor)
+                or self.outside_buttons_down.any_above(self.cur_floor))
+
+    def calls_below(self):
+        """Функция проверяет, есть ли вызовы ниже текущего этажа."""
+        return (self.inside_buttons.any_below(self.cur_floor)
+                or self.outside_buttons_up.any_below(self.cur_floor)
+                or self.outside_buttons_down.any_below(self.cur_floor))
 
     def check_buttons(self):
         """Функция проверяет состояние всех кнопок в кабине и на этажах,
-        изменяет скорость (направление) движения и позицию лифта."""
+        изменяет скорость (направление) движения и позицию лифта.
+        Возвращает продолжительность перемещения или None при остановке."""
 
-        inside_higher = sum(self.inside_buttons[self.cur_floor+1:])
-        inside_lower = sum(self.inside_buttons[:self.cur_floor])
+        # Проверки выполняются по битовым маскам без перебора этажей:
+        inside_higher = self.inside_buttons.any_above(self.cur_floor)
+        inside_lower = self.inside_buttons.any_below(self.cur_floor)
 
-        outside_higher_up = sum(self.outside_buttons_up[self.cur_floor+1:])
-        outside_lower_up = sum(self.outside_buttons_up[:self.cur_floor])
-        outside_higher_down = sum(self.outside_buttons_down[self.cur_floor+1:])
-        outside_lower_down = sum(self.outside_buttons_down[:self.cur_floor])
+        outside_higher_up = self.outside_buttons_up.any_above(self.cur_floor)
+        outside_lower_up = self.outside_buttons_up.any_below(self.cur_floor)
+        outside_higher_down = self.outside_buttons_down.any_above(self.cur_floor)
+        outside_lower_down = self.outside_buttons_down.any_below(self.cur_floor)
 
         # Проверка кнопок при движении вверх:
         if self.speed == 1:
             # Кнопки по ходу движения вверх в порядке приоритетности:
-            if inside_higher > 0 or outside_higher_up > 0 or outside_higher_down > 0:
+            if inside_higher or outside_higher_up or outside_higher_down:
                 stop_movement = False
             # Кнопки ниже текущего этажа в любом направлении:
-            elif inside_lower > 0 or outside_lower_up > 0 or outside_lower_down > 0:
+            elif inside_lower or outside_lower_up or outside_lower_down:
                 self.speed = -1
                 stop_movement = False
             else:  # Нет нажатых кнопок:
@@ -129,46 +214,76 @@ class Elevator:
         # Проверка кнопок при движении вниз:
         elif self.speed == -1:
             # Кнопки по ходу движения вниз в порядке приоритетности:
-            if inside_lower > 0 or outside_lower_down > 0 or outside_lower_up > 0:
+            if inside_lower or outside_lower_down or outside_lower_up:
                 stop_movement = False
             # Кнопки выше текущего этажа в любом направлении:
-            elif inside_higher > 0 or outside_higher_up > 0 or outside_higher_down > 0:
+            elif inside_higher or outside_higher_up or outside_higher_down:
                 self.speed = 1
                 stop_movement = False
             else:  # Нет нажатых кнопок:
                 stop_movement = True
 
         # Случай, когда повторно нажата кнопка текущего этажа после остановки лифта:
+        # Лифт с нулевой скоростью останется на том же этаже, но двери откроются.
+        # Если вызов с текущего этажа уже обслужен, лифт останавливается.
         else:
-            stop_movement = False  # Лифт с нулевой скоростью останется на том же этаже, но двери откроются.
+            stop_movement = not self.inside_buttons[self.cur_floor]
 
         if stop_movement:
-            self.stop()
+            return self.stop()
         else:
-            self.move()
+            return self.move()
 
     def move(self):
-        """Функция перемещает лифт на следующий этаж по ходу движения.
+        """Функция начинает перемещение лифта на следующий этаж по ходу движения.
         Скорость движения лифта - 1 этаж в секунду."""
-        time.sleep(1)
+        self.action = 'move'
+        return MOVE_TIME
+
+    def arrive(self):
+        """Функция завершает перемещение лифта на следующий этаж."""
+        self.action = None
         self.cur_floor += self.speed
 
     def stop(self):
         """Функция остановливает движение лифта при отсутствии вызовов."""
         self.speed = 0
         self.moving = False
-        print('Stopped moving. No buttons pressed.')
-
-    def activate_doors(self):
-        """Функция для открытия и закрытия дверей при остановке лифта на этаже.
-        Продолжительность остановки - 5 секунд."""
-        print('Movement paused.')
-        print('Doors opened.')
-        time.sleep(5)
-        print('Doors closed.')
+        self.record(STOPPED, self.cur_floor)
+
+    def activate_doors(self, buttons):
+        """Функция открывает двери при остановке лифта на этаже для обслуживания
+        вызова с кнопок buttons. Продолжительность остановки - 5 секунд."""
+        self.record(DOORS_OPENED, self.cur_floor, self.speed)
+        self.action = 'doors'
+        self.serving = buttons
+        return DOOR_TIME
+
+    def close_doors(self):
+        """Функция закрывает двери и сбрасывает обслуженный вызов."""
+        self.record(DOORS_CLOSED, self.cur_floor, self.speed)
+        self.serving[self.cur_floor] = False
+        self.action = None
+        self.serving = None
+
+
+def random_button(n_floors, rng=random):
+    """Функция выбирает случайную кнопку: в кабине или на этаже.
+    Возвращает тип кнопки, этаж и направление вызова (для кнопок на этажах)."""
+    action_type = rng.choice(['inside', 'outside'])
+    floor = rng.randint(1, n_floors)
+    direction = 0
+    if action_type == 'outside':
+        if floor == 1:
+            direction = 1
+        elif floor == n_floors:
+            direction = -1
+        else:
+            direction = rng.choice([1, -1])
+    return action_type, floor, direction
 
 
-def random_calls(n_floors):
+def random_calls(lift):
     """Функция имитирует вызовы лифта пассажирами.
     Нажатие случайной кнопки происходит каждые 3-5 секунд."""
     print('Random function started.')
@@ -177,20 +292,56 @@ def random_calls(n_floors):
         time_gap = random.randint(3, 5)
         time.sleep(time_gap)
 
-        action_type = random.choice(['inside', 'outside'])
-        floor = random.randint(1, n_floors)
+        action_type, floor, direction = random_button(lift.n_floors)
         if action_type == 'inside':
             Thread(target=lift.press_inside_button, args=(floor,)).start()
         elif action_type == 'outside':
-            if floor == 1:
-                direction = 1
-            elif floor == n_floors:
-                direction = -1
-            else:
-                direction = random.choice([1, -1])
             Thread(target=lift.press_outside_button, args=(floor, direction)).start()
 
 
-lift = Elevator(n_floors)
+class RandomCalls:
+    """Класс имитирует вызовы лифта пассажирами в виртуальном времени.
+    Нажатие случайной кнопки происходит каждые 3-5 секунд."""
+
+    def __init__(self, lift, loop, rng=random):
+        """При инициализации указываются лифт, движок событий
+        и генератор случайных чисел."""
+        self.lift = lift
+        self.loop = loop
+        self.rng = rng
+
+    def start(self):
+        """Функция планирует первое нажатие кнопки."""
+        self.loop.schedule(self.rng.randint(3, 5), self.call)
+
+    def call(self):
+        """Функция нажимает случайную кнопку и планирует следующее нажатие."""
+        action_type, floor, direction = random_button(self.lift.n_floors, self.rng)
+        if action_type == 'inside':
+            self.lift.press_inside_button(floor)
+        elif action_type == 'outside':
+            self.lift.press_outside_button(floor, direction)
+        self.loop.schedule(self.rng.randint(3, 5), self.call)
+
+
+def simulate(n_floors, duration, seed=None, events=None):
+    """Функция моделирует работу лифта в виртуальном времени
+    в течение duration секунд и возвращает лифт.
+    События записываются в журнал events с отметками виртуального времени."""
+    loop = EventLoop()
+    lift = Elevator(n_floors, loop, events, loop.time)
+    RandomCalls(lift, loop, random.Random(seed)).start()
+    loop.run(until=duration)
+    return lift
+
+
+if __name__ == '__main__':
+    n_floors = int(input('Number of floors:\t'))
+    duration = input('Simulated time, seconds (Enter - real time):\t')
+
+    if duration:
+        simulate(n_floors, float(duration), events=ConsoleEventLog(MESSAGES))
+    else:
+        lift = Elevator(n_floors, events=ConsoleEventLog(MESSAGES))
 
-Thread(target=random_calls, args=(n_floors,)).start()
+        Thread(target=random_calls, args=(lift,)).start()
@@ -0,0 +1,263 @@
+"""Программный интерфейс для моделирования работы лифтов.
+Класс Simulation собирает здание по описанию BuildingConfig: создает собственные
+движок событий, генератор случайных чисел, систему синхронизации и лифты.
+Все состояние модели хранится в экземпляре, поэтому в одном процессе можно
+создать сколько угодно независимых моделей. Импорт модуля не запрашивает
+ввод, не запускает потоков и не загружает NumPy.
+Модель можно запустить на заданное количество секунд виртуального времени
+или обрабатывать события по одному:
+
+    sim = Simulation(BuildingConfig(n_floors=20, n_elevators=4, arrivals_per_minute=6), seed=1)
+    sim.run(3600)
+    print(sim.summary())
+
+Лифты высотного здания можно разделить на зоны (см. sky_lobby_zones).
+Состояние модели в виртуальном времени можно сохранить в контрольной точке
+(checkpoint, save), восстановить (restore, load) и скопировать (fork), чтобы
+сравнить, например, способы распределения вызовов (set_dispatch) с одного
+и того же момента без повторного моделирования всего, что было до него:
+
+    rush = Simulation(BuildingConfig(50, 16, 40), seed=1)
+    rush.run(3600)
+    greedy, batched = rush.fork(2)
+    batched.set_dispatch(batch_window=1.0)
+"""
+
+import pickle
+import random
+import zlib
+
+from event_engine import EventLoop
+from multi_elevator_algorithm import Dispatcher, Elevator, RandomCalls
+from batching import BatchDispatcher
+from passengers import PassengerTraffic
+from metrics import PerformanceMetrics
+from traces import TraceReplay
+from traffic import TrafficGenerator, GeneratedTraffic
+from telemetry import Telemetry
+
+CHECKPOINT_VERSION = 1  # Версия формата контрольной точки
+
+
+class BuildingConfig:
+    """Описание здания: количество этажей, количество лифтов и интенсивность
+    пассажиропотока (пассажиров в минуту). Если интенсивность не указана,
+    кнопки в кабинах и на этажах нажимаются случайно каждые 2-3 секунды.
+    Зоны zones - список пар (этажи, на которых останавливаются лифты зоны,
+    количество лифтов зоны); если зоны указаны, количество лифтов можно не указывать.
+    Без зон каждый лифт обслуживает все этажи."""
+
+    def __init__(self, n_floors, n_elevators=None, arrivals_per_minute=None, zones=None):
+        if n_floors < 2:
+            raise ValueError('В здании должно быть не меньше двух этажей')
+        if zones is not None:
+            zones = [(sorted(floors), count) for floors, count in zones]
+            if any(not 1 <= floor <= n_floors for floors, _ in zones for floor in floors):
+                raise ValueError('Этажи зоны должны быть этажами здания')
+            total = sum(count for _, count in zones)
+            if n_elevators is None:
+                n_elevators = total
+            elif n_elevators != total:
+                raise ValueError('Количество лифтов не совпадает с количеством лифтов в зонах')
+        if n_elevators is None or n_elevators < 1:
+            raise ValueError('В здании должен быть хотя бы один лифт')
+        self.n_floors = n_floors
+        self.n_elevators = n_elevators
+        self.arrivals_per_minute = arrivals_per_minute
+        self.zones = zones
+
+    def elevator_floors(self):
+        """Функция возвращает для каждого лифта этажи, на которых он останавливается
+        (None - все этажи)."""
+        if self.zones is None:
+            return [None] * self.n_elevators
+        return [floors for floors, count in self.zones for _ in range(count)]
+
+    def __repr__(self):
+        return (f'BuildingConfig(n_floors={self.n_floors}, n_elevators={self.n_elevators}, '
+                f'arrivals_per_minute={self.arrivals_per_minute}, zones={self.zones})')
+
+
+def sky_lobby_zones(n_floors, sky_lobbies, local_elevators, express_elevators):
+    """Функция описывает зоны высотного здания с этажами пересадки (sky lobby):
+    этажи sky_lobbies делят здание на зоны, в каждой зоне по local_elevators лифтов
+    останавливаются на всех этажах от нижнего этажа зоны (1-го или этажа пересадки)
+    до следующего этажа пересадки. Каждый этаж пересадки соединяют с 1-м этажом
+    express_elevators экспресс-лифтов без промежуточных остановок.
+    Возвращает список зон для BuildingConfig."""
+    bounds = [1] + sorted(sky_lobbies) + [n_floors + 1]
+    zones = []
+    for low, high in zip(bounds, bounds[1:]):
+        zones.append((range(low, high), local_elevators))
+        if low > 1:
+            zones.append(((1, low), express_elevators))
+    return zones
+
+
+class Simulation:
+    """Класс моделирует работу лифтов одного здания в виртуальном времени."""
+
+    def __init__(self, config, seed=None, events=None, hooks=(), traffic=True, metrics=False,
+                 batch_window=None, profile=None, profile_start=None):
+        """При инициализации указываются описание здания и начальное значение генератора
+        случайных чисел. Дополнительно можно указать журнал событий, обработчики событий
+        (наследники metrics.Hooks), отключить генерацию вызовов (traffic=False) - тогда
+        вызовы поступают только через press_inside, press_outside и replay, - и включить
+        сбор показателей работы лифтов (metrics=True). Если указано batch_window, вызовы
+        с этажей распределяются пакетами раз в batch_window секунд (batching.BatchDispatcher).
+        Если указан профиль пассажиропотока profile (список traffic.Period, например
+        traffic.office_day), пассажиры появляются по профилю начиная с момента профиля
+        profile_start (по умолчанию - с начала профиля), а интенсивность из описания
+        здания не используется."""
+        self.config = config
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.loop = EventLoop()
+        self.dispatcher = self.new_dispatcher(batch_window, events, hooks)
+        self.replays = []  # Объекты TraceReplay, созданные функцией replay
+        self.elevators = [Elevator(config.n_floors, self.dispatcher, self.loop, floors)
+                          for floors in config.elevator_floors()]
+        self.metrics = PerformanceMetrics(self.dispatcher) if metrics else None
+        self.traffic = None
+        self.telemetry = None
+        if traffic:
+            if profile is not None:
+                # Начальное значение генератора пассажиров определяется начальным значением модели:
+                generator = TrafficGenerator(config.n_floors, profile, self.rng.getrandbits(63))
+                self.traffic = GeneratedTraffic(self.dispatcher, self.loop, generator, profile_start)
+            elif config.arrivals_per_minute:
+                self.traffic = PassengerTraffic(self.dispatcher, self.loop,
+                                                config.arrivals_per_minute, self.rng)
+            else:
+                self.traffic = RandomCalls(self.dispatcher, self.loop, self.rng)
+            self.traffic.start()
+
+    def new_dispatcher(self, batch_window, events, hooks):
+        """Функция создает систему синхронизации лифтов: с пакетным распределением
+        вызовов, если указано batch_window, иначе - с выбором лифта сразу после вызова."""
+        if batch_window is None:
+            return Dispatcher(self.config.n_floors, events, self.loop.time, hooks)
+        return BatchDispatcher(self.config.n_floors, self.loop, batch_window, events, hooks)
+
+    def set_dispatch(self, batch_window=None):
+        """Функция меняет способ распределения вызовов с этажей: пакетами раз
+        в batch_window секунд или, если batch_window не указано, сразу после вызова.
+        Лифты, их вызовы и обработчики событий передаются новой системе синхронизации."""
+        old = self.dispatcher
+        self.dispatcher = self.new_dispatcher(batch_window, old.events, old.hooks)
+        for user in [self.traffic, self.telemetry] + self.replays:
+            if user is not None:
+                user.dispatcher = self.dispatcher
+        old.hand_over(self.dispatcher)
+
+    def checkpoint(self):
+        """Функция возвращает контрольную точку - сжатое полное состояние модели:
+        положение, направление и кнопки лифтов, очередь событий, состояние
+        генератора случайных чисел, пассажиропоток и показатели работы лифтов.
+        Журнал событий в контрольную точку не входит. Воспроизведение вызовов
+        из файла (replay(read_trace(path))) сохранить нельзя, из списка - можно."""
+        dispatcher = self.dispatcher
+        if dispatcher.concurrent:
+            raise ValueError('Сохранить можно только модель в виртуальном времени')
+        events = dispatcher.events
+        dispatcher.events = None
+        try:
+            data = pickle.dumps((CHECKPOINT_VERSION, self), pickle.HIGHEST_PROTOCOL)
+        finally:
+            dispatcher.events = events
+        return zlib.compress(data, 1)
+
+    @classmethod
+    def restore(cls, checkpoint, events=None):
+        """Функция восстанавливает модель из контрольной точки. Дополнительно
+        можно указать журнал событий, в который модель будет записывать события.
+        Контрольная точка читается модулем pickle, который при чтении может выполнить
+        произвольный код, поэтому восстанавливать можно только контрольные точки,
+        полученные из надежного источника (например, созданные своей же программой)."""
+        version, simulation = pickle.loads(zlib.decompress(checkpoint))
+        if version != CHECKPOINT_VERSION:
+            raise ValueError(f'Неподдерживаемая версия контрольной точки: {version}')
+        simulation.dispatcher.events = events
+        return simulation
+
+    def fork(self, copies=1):
+        """Функция возвращает список из copies независимых копий модели в текущем
+        состоянии. Копии продолжают с тем же состоянием генератора случайных чисел,
+        поэтому при одинаковых настройках повторяют друг друга."""
+        checkpoint = self.checkpoint()
+        return [self.restore(checkpoint) for _ in range(copies)]
+
+    def save(self, path):
+        """Функция записывает контрольную точку в файл. Возвращает ее размер в байтах."""
+        checkpoint = self.checkpoint()
+        with open(path, 'wb') as file:
+            file.write(checkpoint)
+        return len(checkpoint)
+
+    @classmethod
+    def load(cls, path, events=None):
+        """Функция восстанавливает модель из контрольной точки, записанной в файл.
+        Как и restore, при чтении может выполнить код из файла: загружать можно только свои
+        или полученные из надежного источника файлы."""
+        with open(path, 'rb') as file:
+            return cls.restore(file.read(), events)
+
+    def watch(self, interval=1.0, size=1024, window=300.0, max_overhead=0.02):
+        """Функция начинает наблюдение за моделью: каждые interval секунд виртуального
+        времени снимается снимок состояния лифтов и времени ожидания пассажиров
+        за последние window секунд. Снимки хранятся в кольцевом буфере из size снимков.
+        На снимки тратится не больше max_overhead времени моделирования.
+        Возвращает объект telemetry.Telemetry (см. также telemetry.serve)."""
+        waits = self.traffic.wait_times if isinstance(self.traffic, PassengerTraffic) else None
+        self.telemetry = Telemetry(self.dispatcher, self.loop, interval, size, window, waits, max_overhead)
+        self.telemetry.start()
+        return self.telemetry
+
+    @property
+    def now(self):
+        """Текущее виртуальное время, секунд."""
+        return self.loop.now
+
+    def run(self, seconds):
+        """Функция моделирует работу лифтов в течение seconds секунд виртуального времени.
+        Возвращает количество обработанных событий."""
+        return self.loop.run(until=self.loop.now + seconds)
+
+    def run_until(self, when):
+        """Функция моделирует работу лифтов до момента виртуального времени when."""
+        return self.loop.run(until=when)
+
+    def step(self):
+        """Функция обрабатывает одно ближайшее событие.
+        Возвращает False, если событий больше нет."""
+        return self.loop.step()
+
+    def press_inside(self, obj_id, floor):
+        """Функция нажимает кнопку этажа floor в кабине лифта obj_id."""
+        self.elevators[obj_id].press_inside_button(floor)
+
+    def press_outside(self, floor, direction):
+        """Функция нажимает кнопку вызова лифта на этаже floor в направлении direction."""
+        self.dispatcher.press_outside_button(floor, direction)
+
+    def replay(self, calls):
+        """Функция планирует воспроизведение записанных вызовов (например, traces.read_trace(path))
+        начиная с текущего виртуального времени. Возвращает объект TraceReplay."""
+        replay = TraceReplay(self.dispatcher, self.loop, calls)
+        replay.start()
+        self.replays.append(replay)
+        return replay
+
+    def positions(self):
+        """Функция возвращает список этажей, на которых находятся лифты."""
+        return list(self.dispatcher.elevators_position)
+
+    def summary(self):
+        """Функция возвращает сводные показатели: пассажиропотока (если он моделируется)
+        и работы лифтов (если включен их сбор)."""
+        summary = {'time': self.loop.now}
+        if isinstance(self.traffic, PassengerTraffic):
+            summary['passengers'] = self.traffic.summary()
+        if self.metrics is not None:
+            summary['metrics'] = self.metrics.summary()
+        return summary
@@ -0,0 +1,83 @@
+"""Перебор параметров моделирования для планирования количества лифтов.
+Для каждого сочетания количества этажей, количества лифтов, интенсивности
+пассажиропотока и начального значения генератора случайных чисел работа лифтов
+моделируется в виртуальном времени в отдельном процессе. Показатели всех запусков
+(среднее и 95-й процентиль времени ожидания, среднее время поездки, количество
+остановок на лифт) собираются в общую таблицу. Результат каждого запуска
+полностью определяется его параметрами, включая начальное значение генератора.
+При запуске скрипта значения параметров задаются через консоль списками через запятую.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import csv
+
+from simulation import BuildingConfig, Simulation
+
+COLUMNS = ['n_floors', 'n_elevators', 'arrivals_per_minute', 'seed',
+           'passengers', 'mean_wait', 'p95_wait', 'mean_trip', 'stops_per_car']
+
+
+def check_rate(arrivals_per_minute):
+    """Функция проверяет, что интенсивность пассажиропотока больше нуля:
+    без пассажиров показатели ожидания и поездок не собираются."""
+    if not arrivals_per_minute > 0:
+        raise ValueError(f'Интенсивность пассажиропотока должна быть больше нуля: {arrivals_per_minute}')
+
+
+def run_one(n_floors, n_elevators, arrivals_per_minute, seed, duration):
+    """Функция моделирует работу лифтов с заданными параметрами
+    в течение duration секунд и возвращает строку таблицы результатов."""
+    check_rate(arrivals_per_minute)
+    simulation = Simulation(BuildingConfig(n_floors, n_elevators, arrivals_per_minute), seed)
+    simulation.run(duration)
+    return {'n_floors': n_floors, 'n_elevators': n_elevators,
+            'arrivals_per_minute': arrivals_per_minute, 'seed': seed,
+            **simulation.traffic.summary()}
+
+
+def sweep(floors, elevators, rates, seeds, duration, processes=None):
+    """Функция моделирует работу лифтов для всех сочетаний параметров
+    в пуле из processes процессов (по умолчанию - по числу ядер процессора).
+    Возвращает таблицу результатов в виде списка словарей в порядке перебора параметров."""
+    for rate in rates:  # До запуска процессов
+        check_rate(rate)
+    grid = list(product(floors, elevators, rates, seeds))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(run_one, *params, duration) for params in grid]
+        return [future.result() for future in futures]
+
+
+def print_table(rows):
+    """Функция выводит таблицу результатов в консоль."""
+    print('\t'.join(COLUMNS))
+    for row in rows:
+        print('\t'.join(f'{row[column]:.2f}' if isinstance(row[column], float) else str(row[column])
+                        for column in COLUMNS))
+
+
+def save_table(rows, path):
+    """Функция сохраняет таблицу результатов в файл формата CSV."""
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_list(text, cast):
+    """Функция преобразует строку значений через запятую в список."""
+    return [cast(value) for value in text.split(',') if value.strip()]
+
+
+if __name__ == '__main__':
+    floors = parse_list(input('Numbers of floors:\t'), int)
+    elevators = parse_list(input('Numbers of elevators:\t'), int)
+    rates = parse_list(input('Passengers per minute:\t'), float)
+    seeds = parse_list(input('Random seeds:\t'), int)
+    duration = float(input('Simulated time, seconds:\t'))
+    path = input('CSV file for results (Enter - console only):\t')
+
+    rows = sweep(floors, elevators, rates, seeds, duration)
+    print_table(rows)
+    if path:
+        save_table(rows, path)
@@ -0,0 +1,223 @@
+"""Наблюдение за работой лифтов во время моделирования.
+Класс Telemetry через равные промежутки времени (interval секунд) снимает
+состояние парка лифтов из системы синхронизации: этажи и направления движения
+лифтов (Dispatcher.fleet - при управлении из нескольких потоков это согласованный
+снимок без блокировки лифтов), количество нажатых кнопок в кабинах и на этажах,
+а также показатели времени ожидания лифта за последние window секунд.
+Снимки хранятся в кольцевом буфере из size последних снимков; их можно читать
+(samples, latest), получать через функции-подписчики (subscribe) или по HTTP
+(serve). Телеметрия не добавляет обработчиков событий лифтов: вся ее работа
+выполняется при снятии снимка. Если снятие снимков заняло больше max_overhead
+от времени работы модели, очередной снимок пропускается, а в виртуальном времени
+промежуток до следующей попытки удваивается (до первого снятого снимка), поэтому
+наблюдение замедляет моделирование не больше чем на эту долю.
+В виртуальном времени снимки снимаются событиями движка (EventLoop),
+в реальном времени (workers.WorkerPool) - отдельным потоком.
+"""
+
+from collections import deque
+import bisect
+from threading import Event, Lock, Thread
+import time
+
+
+class Telemetry:
+    """Класс снимает и хранит снимки состояния парка лифтов."""
+
+    def __init__(self, dispatcher, loop=None, interval=1.0, size=1024, window=300.0,
+                 waits=None, max_overhead=0.02):
+        """При инициализации указываются система синхронизации лифтов, движок событий
+        (если не указан - снимки снимаются потоком в реальном времени), промежуток
+        между снимками в секундах, размер кольцевого буфера снимков, длительность окна
+        для показателей ожидания в секундах, список времен ожидания пассажиров, который
+        пополняется во время моделирования (например, PassengerTraffic.wait_times),
+        и допустимая доля времени работы модели, затрачиваемая на снимки."""
+        self.dispatcher = dispatcher
+        self.loop = loop
+        self.interval = interval
+        self.window = window
+        self.waits = waits
+        self.max_overhead = max_overhead
+        self.buffer = deque(maxlen=size)
+        self.lock = Lock()  # Буфер читается из других потоков (например, HTTP-сервером)
+        self.subscribers = []
+        self.recent = deque()  # (время, время ожидания) за последние window секунд
+        self.ordered = []  # Времена ожидания за последние window секунд по возрастанию
+        self.total = 0.0  # Сумма времен ожидания за последние window секунд
+        self.seen = len(waits) if waits is not None else 0  # Количество учтенных времен ожидания
+        self.seq = 0  # Номер следующего снимка
+        self.delay = interval  # Промежуток до следующей попытки снять снимок в виртуальном времени
+        self.skipped = 0  # Количество снимков, пропущенных из-за превышения max_overhead
+        self.spent = 0.0  # Время, затраченное на снимки, секунд
+        self.started = None  # Момент начала наблюдения по часам time.perf_counter
+        self.stopped = None
+
+    def __getstate__(self):
+        """Блокировка и подписчики в контрольную точку модели не сохраняются."""
+        state = self.__dict__.copy()
+        state.update(lock=None, subscribers=[], stopped=None, started=None, spent=0.0)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = Lock()
+
+    def start(self):
+        """Функция начинает снятие снимков."""
+        self.started = time.perf_counter()
+        if self.loop is not None:
+            self.loop.schedule(0.0, self.tick)
+        else:
+            self.stopped = Event()
+            Thread(target=self.run, name='telemetry', daemon=True).start()
+
+    def stop(self):
+        """Функция прекращает снятие снимков потоком в реальном времени."""
+        if self.stopped is not None:
+            self.stopped.set()
+
+    def run(self):
+        """Функция потока: снимает снимки каждые interval секунд до вызова stop."""
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def tick(self):
+        """Функция снимает снимок в виртуальном времени и планирует следующую попытку:
+        через interval секунд, если снимок снят, иначе - через вдвое больший промежуток."""
+        start = time.perf_counter()
+        if self.started is None:  # Модель восстановлена из контрольной точки
+            self.started = start
+        if self.sample():
+            self.delay = self.interval
+        else:
+            self.delay *= 2
+        self.loop.schedule(self.delay, self.tick)
+        self.spent += time.perf_counter() - start
+
+    def sample(self):
+        """Функция снимает снимок, если это не превысит допустимую долю времени работы модели.
+        Возвращает False, если снимок пропущен."""
+        start = time.perf_counter()
+        if self.spent > self.max_overhead * (start - self.started):
+            self.skipped += 1
+            return False
+        dispatcher = self.dispatcher
+        now = dispatcher.clock()
+        positions, speeds = dispatcher.fleet()
+        car_calls = hall_calls = 0
+        for elevator in dispatcher.elevators:
+            car_calls += elevator.inside_buttons.mask.bit_count()
+            hall_calls += elevator.outside_buttons_up.mask.bit_count()
+            hall_calls += elevator.outside_buttons_down.mask.bit_count()
+        snapshot = {
+            'seq': self.seq,
+            'time': now,
+            'positions': list(positions),
+            'speeds': list(speeds),
+            'moving': sum(1 for speed in speeds if speed),
+            'car_calls': car_calls,
+            'hall_calls': hall_calls,
+            'waits': self.wait_stats(now),
+            'skipped': self.skipped,
+        }
+        self.seq += 1
+        with self.lock:
+            self.buffer.append(snapshot)
+        for callback in self.subscribers:
+            callback(snapshot)
+        if self.loop is None:  # В виртуальном времени учитывается в tick
+            self.spent += time.perf_counter() - start
+        return True
+
+    def wait_stats(self, now):
+        """Функция возвращает показатели времени ожидания пассажиров, севших в лифт
+        за последние window секунд: количество, среднее, 95-й процентиль и максимум."""
+        if self.waits is None:
+            return None
+        recent = self.recent
+        ordered = self.ordered
+        new = self.waits[self.seen:]
+        self.seen += len(new)
+        for wait in new:
+            recent.append((now, wait))
+            bisect.insort(ordered, wait)
+            self.total += wait
+        while recent and recent[0][0] <= now - self.window:
+            _, wait = recent.popleft()
+            del ordered[bisect.bisect_left(ordered, wait)]
+            self.total -= wait
+        count = len(ordered)
+        if not count:
+            self.total = 0.0  # Накопленная ошибка округления отбрасывается
+            return {'count': 0, 'mean': 0.0, 'p95': 0.0, 'max': 0.0}
+        rank = max(0, -(-count * 95 // 100) - 1)  # Ближайший ранг, как в passengers.percentile
+        return {'count': count, 'mean': self.total / count, 'p95': ordered[rank], 'max': ordered[-1]}
+
+    def subscribe(self, callback):
+        """Функция добавляет подписчика: функцию, которая получает каждый новый снимок.
+        Время работы подписчиков входит в долю времени, затрачиваемую на снимки."""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Функция удаляет подписчика."""
+        self.subscribers.remove(callback)
+
+    def samples(self, since=-1):
+        """Функция возвращает хранящиеся в буфере снимки с номерами больше since."""
+        with self.lock:
+            return [snapshot for snapshot in self.buffer if snapshot['seq'] > since]
+
+    def latest(self):
+        """Функция возвращает последний снимок или None, если снимков еще нет."""
+        with self.lock:
+            return self.buffer[-1] if self.buffer else None
+
+    def overhead(self):
+        """Функция возвращает долю времени работы модели, затраченную на снимки."""
+        if self.started is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.started
+        return self.spent / elapsed if elapsed else 0.0
+
+
+def serve(telemetry, host='127.0.0.1', port=0):
+    """Функция запускает HTTP-сервер телеметрии в отдельном потоке и возвращает его:
+    GET /latest - последний снимок, GET /samples?since=N - снимки с номерами больше N.
+    Если порт не указан, выбирается свободный порт (server.server_address).
+    Сервер останавливается функцией server.shutdown()."""
+    # http.server загружается только при запуске сервера, чтобы не замедлять импорт модели:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+    import json
+
+    class TelemetryHandler(BaseHTTPRequestHandler):
+        """Обработчик HTTP-запросов к телеметрии."""
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path in ('/', '/latest'):
+                body = telemetry.latest()
+            elif url.path == '/samples':
+                try:
+                    since = int(parse_qs(url.query).get('since', ['-1'])[0])
+                except ValueError:
+                    self.send_error(400, 'since must be an integer')
+                    return
+                body = telemetry.samples(since)
+            else:
+                self.send_error(404)
+                return
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            """Запросы не выводятся в консоль."""
+
+    server = ThreadingHTTPServer((host, port), TelemetryHandler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, name='telemetry-http', daemon=True).start()
+    return server
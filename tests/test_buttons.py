@@ -0,0 +1,41 @@
+"""Проверка поиска нажатых кнопок в битовых масках (модуль buttons)."""
+
+import random
+import unittest
+
+from buttons import FloorButtons
+
+
+class NearestFloorTest(unittest.TestCase):
+    """Поиск ближайшего этажа с нажатой кнопкой совпадает с перебором этажей."""
+
+    def test_empty(self):
+        buttons = FloorButtons(10)
+        self.assertIsNone(buttons.nearest_above(1))
+        self.assertIsNone(buttons.nearest_below(10))
+
+    def test_edges(self):
+        buttons = FloorButtons(10)
+        buttons[1] = buttons[10] = True
+        self.assertEqual(buttons.nearest_above(1), 10)
+        self.assertEqual(buttons.nearest_below(10), 1)
+        self.assertIsNone(buttons.nearest_above(10))
+        self.assertIsNone(buttons.nearest_below(1))
+
+    def test_random_masks(self):
+        rng = random.Random(1)
+        for _ in range(500):
+            n_floors = rng.randint(2, 300)
+            buttons = FloorButtons(n_floors)
+            pressed = set(rng.sample(range(1, n_floors + 1), rng.randint(0, min(n_floors, 10))))
+            for floor in pressed:
+                buttons[floor] = True
+            for floor in range(1, n_floors + 1):
+                above = [other for other in pressed if other > floor]
+                below = [other for other in pressed if other < floor]
+                self.assertEqual(buttons.nearest_above(floor), min(above) if above else None)
+                self.assertEqual(buttons.nearest_below(floor), max(below) if below else None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Проверка расчета времени прибытия лифта (Elevator.eta) по моделированию:
+расчетное время должно точно совпадать со временем, через которое лифт
+в виртуальном времени откроет двери по новому вызову."""
+
+import pickle
+import random
+import unittest
+
+from event_engine import EventLoop
+from metrics import Hooks
+from multi_elevator_algorithm import Dispatcher, Elevator, random_outside_button
+
+
+class DoorsOpened(Hooks):
+    """Обработчик запоминает момент открытия дверей по кнопке вызова floor."""
+
+    def __init__(self, loop, floor, speed):
+        self.loop = loop
+        self.floor = floor
+        self.speed = speed
+        self.opened = None
+
+    def on_doors_opened(self, elevator, buttons):
+        if (self.opened is None and elevator.cur_floor == self.floor
+                and buttons is elevator.hall_buttons(self.speed)):
+            self.opened = self.loop.now
+
+
+def random_car(n_floors, rng):
+    """Функция создает лифт в виртуальном времени и приводит его в случайное
+    состояние: нажимает случайные кнопки в случайные моменты времени."""
+    loop = EventLoop()
+    dispatcher = Dispatcher(n_floors, clock=loop.time)
+    elevator = Elevator(n_floors, dispatcher, loop)
+    for _ in range(rng.randint(0, 6)):
+        if rng.random() < 0.5:
+            elevator.press_inside_button(rng.randint(1, n_floors))
+        else:
+            elevator.press_outside_button(*random_outside_button(n_floors, rng))
+        loop.run(until=loop.now + rng.choice([0, 0.5, 1, 3, rng.uniform(0, 20)]))
+    return loop, elevator
+
+
+def simulated_eta(loop, elevator, floor, speed):
+    """Функция моделирует копию лифта после вызова с этажа floor в направлении speed
+    и возвращает время до открытия дверей по этому вызову."""
+    loop, elevator = pickle.loads(pickle.dumps((loop, elevator)))
+    hook = DoorsOpened(loop, floor, speed)
+    elevator.dispatcher.hooks.append(hook)
+    start = loop.now
+    elevator.press_outside_button(floor, speed)
+    while hook.opened is None:
+        loop.run(until=loop.now + 60)
+    return hook.opened - start
+
+
+class EtaTest(unittest.TestCase):
+    """Расчетное время прибытия совпадает с моделированием в случайных состояниях лифта."""
+
+    def test_random_states(self):
+        rng = random.Random(13)
+        checked = 0
+        while checked < 2000:
+            n_floors = rng.randint(2, 30)
+            loop, elevator = random_car(n_floors, rng)
+            floor, speed = random_outside_button(n_floors, rng)
+            if elevator.hall_buttons(speed)[floor]:  # Вызов уже получен лифтом
+                continue
+            predicted = elevator.eta(floor, speed, loop.now)
+            with self.subTest(state=elevator.__getstate__(), floor=floor, speed=speed):
+                self.assertAlmostEqual(predicted, simulated_eta(loop, elevator, floor, speed))
+            checked += 1
+
+    def test_plan_follows_state(self):
+        """План объезда остановок, запомненный лифтом, обновляется после каждого
+        изменения состояния лифта: время прибытия совпадает с рассчитанным заново."""
+        rng = random.Random(5)
+        loop, elevator = random_car(25, rng)
+        calls = [random_outside_button(25, rng) for _ in range(20)]
+        for _ in range(300):
+            if rng.random() < 0.3:
+                elevator.press_inside_button(rng.randint(1, 25))
+            elif rng.random() < 0.3:
+                elevator.press_outside_button(*random_outside_button(25, rng))
+            else:
+                loop.run(until=loop.now + rng.choice([0.5, 1, 2, 5]))
+            fresh = pickle.loads(pickle.dumps(elevator))  # Копия без запомненного плана
+            for floor, speed in calls:
+                self.assertEqual(elevator.eta(floor, speed, loop.now), fresh.eta(floor, speed, loop.now))
+
+    def test_dispatcher_eta(self):
+        """Dispatcher.eta совпадает с Elevator.eta и не зависит от предыдущих запросов."""
+        rng = random.Random(7)
+        loop, elevator = random_car(20, rng)
+        dispatcher = elevator.dispatcher
+        calls = [random_outside_button(20, rng) for _ in range(50)]
+        first = [dispatcher.eta(0, floor, speed) for floor, speed in calls]
+        self.assertEqual(first, [elevator.eta(floor, speed, loop.now) for floor, speed in calls])
+        self.assertEqual(first, [dispatcher.eta(0, floor, speed) for floor, speed in calls])
+
+
+if __name__ == '__main__':
+    unittest.main()
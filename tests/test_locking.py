@@ -0,0 +1,80 @@
+"""Проверка блокировок лифтов при нажатии кнопок из нескольких потоков."""
+
+from threading import Event, Thread
+import time
+import unittest
+
+from multi_elevator_algorithm import Dispatcher, Elevator
+import workers
+
+
+class SlowStopElevator(Elevator):
+    """Лифт, который перед остановкой сообщает об этом и ждет pause секунд:
+    так нажатие кнопки из другого потока гарантированно попадает в промежуток
+    между решением об остановке и самой остановкой."""
+
+    pause = 0.05
+
+    def __init__(self, *args, **kwargs):
+        self.stopping = Event()
+        super().__init__(*args, **kwargs)
+
+    def stop(self):
+        self.stopping.set()
+        time.sleep(self.pause)
+        return super().stop()
+
+
+class PressWhileStoppingTest(unittest.TestCase):
+    """Нажатие кнопки, пока лифт останавливается, не теряется: без блокировки лифта
+    нажавший поток видит лифт еще движущимся и не ведет его, а лифт, решивший
+    остановиться до нажатия, останавливается с необслуженным вызовом."""
+
+    def test_hall_call_during_stop(self):
+        dispatcher = Dispatcher(10)
+        dispatcher.time_scale = 0.0
+        elevator = SlowStopElevator(10, dispatcher)
+        driver = Thread(target=elevator.press_inside_button, args=(3,))
+        driver.start()
+        self.assertTrue(elevator.stopping.wait(5))
+        presser = Thread(target=elevator.press_outside_button, args=(6, -1))
+        presser.start()
+        driver.join(5)
+        presser.join(5)
+        self.assertFalse(elevator.moving)
+        self.assertEqual(elevator.cur_floor, 6)
+        self.assertEqual(elevator.planned_stops(), 0)
+
+    def test_car_call_during_stop(self):
+        dispatcher = Dispatcher(10)
+        dispatcher.time_scale = 0.0
+        elevator = SlowStopElevator(10, dispatcher)
+        driver = Thread(target=elevator.press_inside_button, args=(4,))
+        driver.start()
+        self.assertTrue(elevator.stopping.wait(5))
+        presser = Thread(target=elevator.press_inside_button, args=(2,))
+        presser.start()
+        driver.join(5)
+        presser.join(5)
+        self.assertFalse(elevator.moving)
+        self.assertEqual(elevator.cur_floor, 2)
+        self.assertEqual(elevator.planned_stops(), 0)
+
+
+class StressTest(unittest.TestCase):
+    """Нажатия из многих потоков получены лифтами и обслужены
+    (функции stress_test и direct_stress_test вызывают исключение, если это не так)."""
+
+    def test_worker_threads(self):
+        result = workers.stress_test(20, 4, 8, 50, seed=1)
+        self.assertEqual(result['received'], result['calls'])
+        self.assertEqual(result['pending'], 0)
+
+    def test_direct_presses(self):
+        result = workers.direct_stress_test(20, 4, 8, 50, seed=1)
+        self.assertEqual(result['received'], result['calls'])
+        self.assertEqual(result['pending'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+"""Воспроизведение записанных вызовов лифтов.
+Журнал вызовов хранится в файле CSV или в компактном двоичном формате.
+Каждая запись содержит время вызова в секундах, тип вызова ('hall' - кнопка
+на этаже, 'car' - кнопка в кабине), этаж, направление (для вызовов с этажа)
+и id лифта (для вызовов из кабины). Пример файла CSV:
+
+    time,kind,floor,direction,elevator
+    0.0,hall,5,1,
+    12.5,car,9,,0
+
+Файл читается последовательно по мере воспроизведения, поэтому расход памяти
+не зависит от длины журнала. Записи должны быть упорядочены по времени:
+запись раньше предыдущей вызывает исключение ValueError. Вызовы передаются в Dispatcher.press_outside_button
+и Elevator.press_inside_button в записанные моменты времени. Запись с неизвестным
+типом вызова, этажом вне здания, направлением вызова с этажа, отличным от 1 и -1,
+или без id существующего лифта для вызова из кабины также вызывает ValueError.
+При запуске скрипта журнал в формате CSV преобразуется в двоичный формат.
+"""
+
+from collections import namedtuple
+import csv
+import struct
+import time
+
+from event_engine import EventLoop
+from multi_elevator_algorithm import Dispatcher, Elevator
+
+HALL = 0  # Вызов кнопкой на этаже
+CAR = 1  # Вызов кнопкой в кабине
+KINDS = {'hall': HALL, 'car': CAR}
+
+RECORD = struct.Struct('<dBhbi')  # Время, тип вызова, этаж, направление, id лифта
+
+Call = namedtuple('Call', ['time', 'kind', 'floor', 'direction', 'elevator'])
+
+
+def read_csv_trace(path):
+    """Генератор последовательно читает вызовы из файла CSV."""
+    with open(path, newline='') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # Заголовок
+        for row in reader:
+            if not row:
+                continue
+            try:
+                call_time, kind, floor, direction, elevator = row
+                call = Call(float(call_time), KINDS[kind], int(floor),
+                            int(direction) if direction else 0, int(elevator) if elevator else -1)
+            except (ValueError, KeyError):
+                raise ValueError(f'Недопустимая запись в журнале: {row}') from None
+            yield call
+
+
+def read_binary_trace(path, chunk_records=4096):
+    """Генератор последовательно читает вызовы из двоичного файла."""
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(RECORD.size * chunk_records)
+            if not chunk:
+                break
+            usable = len(chunk) - len(chunk) % RECORD.size
+            for fields in RECORD.iter_unpack(chunk[:usable]):
+                yield Call(*fields)
+
+
+def read_trace(path):
+    """Функция выбирает способ чтения журнала вызовов по расширению файла."""
+    if path.endswith('.csv'):
+        return read_csv_trace(path)
+    return read_binary_trace(path)
+
+
+def write_binary_trace(calls, path, buffer_size=1 << 16):
+    """Функция записывает вызовы в двоичный файл. Возвращает количество записей."""
+    n_calls = 0
+    with open(path, 'wb', buffering=buffer_size) as file:
+        for call in calls:
+            file.write(RECORD.pack(*call))
+            n_calls += 1
+    return n_calls
+
+
+def check_order(previous, call):
+    """Функция проверяет, что вызов call записан не раньше предыдущего вызова previous."""
+    if previous is not None and call.time < previous.time:
+        raise ValueError(f'Вызовы в журнале не упорядочены по времени: {call} после {previous}')
+
+
+def check_call(dispatcher, call):
+    """Функция проверяет, что записанный вызов можно воспроизвести в здании системы
+    синхронизации dispatcher: тип вызова известен, этаж есть в здании, у вызова с этажа
+    направление 1 или -1, у вызова из кабины - id существующего лифта."""
+    if call.kind == HALL:
+        valid = call.direction in (1, -1)
+    elif call.kind == CAR:
+        valid = 0 <= call.elevator < len(dispatcher.elevators)
+    else:
+        valid = False
+    if not valid or not 1 <= call.floor <= dispatcher.n_floors:
+        raise ValueError(f'Недопустимый вызов в журнале: {call}')
+
+
+def press(dispatcher, call):
+    """Функция нажимает кнопку, соответствующую записанному вызову.
+    Недопустимый вызов (см. check_call) вызывает исключение ValueError."""
+    check_call(dispatcher, call)
+    if call.kind == HALL:
+        dispatcher.press_outside_button(call.floor, call.direction)
+    else:
+        dispatcher.elevators[call.elevator].press_inside_button(call.floor)
+
+
+class TraceReplay:
+    """Класс воспроизводит записанные вызовы в виртуальном времени.
+    В очереди событий в каждый момент находится только следующий вызов журнала."""
+
+    def __init__(self, dispatcher, loop, calls):
+        """При инициализации указываются система синхронизации лифтов, движок событий
+        и последовательность вызовов, упорядоченная по времени (например, read_trace(path)).
+        Время первого вызова совмещается с текущим временем движка событий."""
+        self.dispatcher = dispatcher
+        self.loop = loop
+        self.calls = iter(calls)
+        self.offset = None  # Разница между временем движка событий и временем журнала
+        self.replayed = 0
+        self.next_call = None
+
+    def start(self):
+        """Функция планирует воспроизведение первого вызова журнала."""
+        self.next_call = next(self.calls, None)
+        if self.next_call is not None:
+            self.offset = self.loop.now - self.next_call.time
+            self.loop.call_at(self.next_call.time + self.offset, self.fire)
+
+    def fire(self):
+        """Функция воспроизводит очередной вызов и планирует следующий."""
+        call = self.next_call
+        press(self.dispatcher, call)
+        self.replayed += 1
+        self.next_call = next(self.calls, None)
+        if self.next_call is not None:
+            check_order(call, self.next_call)
+            self.loop.call_at(self.next_call.time + self.offset, self.fire)
+
+
+def replay(n_floors, n_elevators, path, duration=None, events=None):
+    """Функция воспроизводит журнал вызовов из файла path в виртуальном времени
+    (до момента duration или до конца журнала) и возвращает систему синхронизации лифтов."""
+    loop = EventLoop()
+    dispatcher = Dispatcher(n_floors, events, loop.time)
+    for _ in range(n_elevators):
+        Elevator(n_floors, dispatcher, loop)
+    TraceReplay(dispatcher, loop, read_trace(path)).start()
+    loop.run(until=duration)
+    return dispatcher
+
+
+def replay_realtime(pool, calls):
+    """Функция воспроизводит записанные вызовы в реальном времени через потоки
+    управления лифтами (WorkerPool из модуля workers)."""
+    start = None
+    previous = None
+    for call in calls:
+        check_order(previous, call)
+        check_call(pool.dispatcher, call)
+        previous = call
+        if start is None:
+            start = time.monotonic() - call.time
+        delay = start + call.time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        if call.kind == HALL:
+            pool.press_outside_button(call.floor, call.direction)
+        else:
+            pool.press_inside_button(call.elevator, call.floor)
+
+
+if __name__ == '__main__':
+    source = input('CSV trace file:\t')
+    target = input('Binary trace file:\t')
+    print(f'{write_binary_trace(read_csv_trace(source), target)} calls converted.')
@@ -0,0 +1,188 @@
+"""Пассажиропоток с суточным профилем интенсивности.
+Профиль - список периодов (Period): в каждом периоде пассажиры появляются
+пуассоновским потоком с постоянной интенсивностью, а этажи появления и назначения
+выбираются по матрице поездок (od_matrix). Функция office_day описывает рабочий
+день офисного здания: утренний пик (все едут с 1-го этажа), обед, вечерний пик
+(все едут на 1-й этаж) и спокойные периоды между ними.
+Пассажиры генерируются заранее блоками по BLOCK секунд векторными операциями
+NumPy (без NumPy - модулем random, медленнее). Для каждого блока создается свой
+генератор случайных чисел с начальным значением (seed, номер блока), поэтому
+пассажиры блока определяются только начальным значением и не зависят от того,
+сколько блоков и в каком порядке сгенерировано до него. Результат с NumPy
+и без него различается.
+Класс GeneratedTraffic передает сгенерированных пассажиров в модель: вызов
+с этажа в момент появления пассажира, вызов из кабины - когда пассажир сел
+в лифт (см. passengers.PassengerTraffic).
+"""
+
+from collections import namedtuple
+import bisect
+import itertools
+import random
+
+from multi_elevator_algorithm import load_numpy
+from passengers import PassengerTraffic
+
+BLOCK = 300.0  # Длительность блока, пассажиры которого генерируются за один раз, секунд
+HOUR = 3600
+
+# Период профиля: начало и конец (секунды от начала суток), интенсивность
+# (пассажиров в минуту) и матрица поездок:
+Period = namedtuple('Period', ['start', 'end', 'arrivals_per_minute', 'od'])
+
+
+def od_matrix(n_floors, incoming=0.0, outgoing=0.0, interfloor=1.0, lobby=1):
+    """Функция строит матрицу поездок: элемент [i][j] - доля пассажиров, едущих
+    с этажа i + 1 на этаж j + 1. incoming - доля пассажиров, едущих с этажа lobby
+    на остальные этажи, outgoing - с остальных этажей на этаж lobby, interfloor -
+    между остальными этажами. Этажи внутри каждой группы поездок равновероятны."""
+    matrix = [[0.0] * n_floors for _ in range(n_floors)]
+    others = [floor for floor in range(1, n_floors + 1) if floor != lobby]
+    for floor in others:
+        matrix[lobby - 1][floor - 1] += incoming / len(others)
+        matrix[floor - 1][lobby - 1] += outgoing / len(others)
+    if len(others) > 1:
+        share = interfloor / (len(others) * (len(others) - 1))
+        for origin, destination in itertools.permutations(others, 2):
+            matrix[origin - 1][destination - 1] += share
+    return matrix
+
+
+def office_day(n_floors, peak_per_minute, lobby=1):
+    """Функция возвращает профиль рабочего дня офисного здания с 7:00 до 20:00
+    с наибольшей интенсивностью peak_per_minute пассажиров в минуту в утренний
+    и вечерний пик."""
+    up_peak = od_matrix(n_floors, incoming=0.85, outgoing=0.05, interfloor=0.10, lobby=lobby)
+    lunch = od_matrix(n_floors, incoming=0.40, outgoing=0.40, interfloor=0.20, lobby=lobby)
+    down_peak = od_matrix(n_floors, incoming=0.05, outgoing=0.85, interfloor=0.10, lobby=lobby)
+    quiet = od_matrix(n_floors, incoming=0.30, outgoing=0.30, interfloor=0.40, lobby=lobby)
+    return [
+        Period(7 * HOUR, 8 * HOUR, 0.3 * peak_per_minute, up_peak),
+        Period(8 * HOUR, 9.5 * HOUR, peak_per_minute, up_peak),
+        Period(9.5 * HOUR, 12 * HOUR, 0.2 * peak_per_minute, quiet),
+        Period(12 * HOUR, 13.5 * HOUR, 0.6 * peak_per_minute, lunch),
+        Period(13.5 * HOUR, 17 * HOUR, 0.2 * peak_per_minute, quiet),
+        Period(17 * HOUR, 18.5 * HOUR, peak_per_minute, down_peak),
+        Period(18.5 * HOUR, 20 * HOUR, 0.2 * peak_per_minute, down_peak),
+    ]
+
+
+class TrafficGenerator:
+    """Класс генерирует пассажиров по профилю блоками по block секунд."""
+
+    def __init__(self, n_floors, periods, seed=0, block=BLOCK):
+        """При инициализации указываются количество этажей, профиль (список Period
+        без пересечений), неотрицательное целое начальное значение генератора
+        случайных чисел и длительность блока."""
+        self.n_floors = n_floors
+        self.periods = sorted(periods)
+        self.seed = seed
+        self.block = block
+        self.start = self.periods[0].start if self.periods else 0.0
+        self.end = self.periods[-1].end if self.periods else 0.0
+        # Накопленные доли поездок по матрице каждого периода (строки матрицы подряд):
+        np = load_numpy()
+        self.cumulative = []
+        for period in self.periods:
+            weights = list(itertools.chain.from_iterable(period.od))
+            if len(weights) != n_floors * n_floors:
+                raise ValueError('Размер матрицы поездок не совпадает с количеством этажей')
+            total = sum(weights)
+            cumulative = [value / total for value in itertools.accumulate(weights)]
+            # Начиная с последней поездки с ненулевой долей - ровно 1, чтобы ошибка округления
+            # не приводила к выбору поездок с нулевой долей в конце матрицы:
+            last = max(trip for trip, weight in enumerate(weights) if weight > 0)
+            cumulative[last:] = [1.0] * (len(cumulative) - last)
+            self.cumulative.append(np.array(cumulative) if np else cumulative)
+
+    def generate(self, start, end):
+        """Функция возвращает пассажиров, появляющихся с момента start до end (по времени
+        профиля): три списка одинаковой длины - время появления, этаж появления и этаж
+        назначения, упорядоченные по времени появления."""
+        times, origins, destinations = [], [], []
+        for index in range(int(start // self.block), int(-(-end // self.block))):
+            block_times, block_origins, block_destinations = self.generate_block(index)
+            first = bisect.bisect_left(block_times, start)
+            last = bisect.bisect_left(block_times, end)
+            times += block_times[first:last]
+            origins += block_origins[first:last]
+            destinations += block_destinations[first:last]
+        return times, origins, destinations
+
+    def generate_block(self, index):
+        """Функция генерирует пассажиров блока index (см. generate)."""
+        block_start = index * self.block
+        block_end = block_start + self.block
+        np = load_numpy()
+        rng = np.random.default_rng([self.seed, index]) if np else random.Random(f'{self.seed}:{index}')
+        times, origins, destinations = [], [], []
+        for period, cumulative in zip(self.periods, self.cumulative):
+            start = max(period.start, block_start)
+            end = min(period.end, block_end)
+            if start >= end or period.arrivals_per_minute <= 0:
+                continue
+            rate = period.arrivals_per_minute / 60
+            if np:
+                count = rng.poisson(rate * (end - start))
+                times += np.sort(rng.uniform(start, end, count)).tolist()
+                trips = np.searchsorted(cumulative, rng.random(count), side='right')
+                origins += (trips // self.n_floors + 1).tolist()
+                destinations += (trips % self.n_floors + 1).tolist()
+            else:
+                moment = start + rng.expovariate(rate)
+                while moment < end:
+                    origin, destination = divmod(bisect.bisect_right(cumulative, rng.random()), self.n_floors)
+                    times.append(moment)
+                    origins.append(origin + 1)
+                    destinations.append(destination + 1)
+                    moment += rng.expovariate(rate)
+        return times, origins, destinations
+
+
+class GeneratedTraffic(PassengerTraffic):
+    """Класс передает в модель пассажиров, сгенерированных TrafficGenerator,
+    и собирает показатели работы лифтов так же, как PassengerTraffic.
+    В очереди событий в каждый момент находится только появление следующего пассажира."""
+
+    def __init__(self, dispatcher, loop, generator, start=None):
+        """При инициализации указываются система синхронизации лифтов, движок событий,
+        генератор пассажиров и время профиля, соответствующее началу моделирования
+        (по умолчанию - начало первого периода профиля)."""
+        super().__init__(dispatcher, loop, 0, None)  # Интенсивность задается профилем
+        self.generator = generator
+        self.start_time = generator.start if start is None else start
+        self.offset = 0.0  # Разница между временем профиля и временем движка событий
+        self.generated_until = self.start_time
+        self.times, self.origins, self.destinations = [], [], []
+        self.index = 0  # Номер следующего пассажира в сгенерированном блоке
+        self.generated = 0
+
+    def start(self):
+        """Функция планирует появление первого пассажира."""
+        self.offset = self.start_time - self.loop.now
+        self.plan()
+
+    def plan(self):
+        """Функция планирует появление следующего пассажира, при необходимости
+        генерируя следующий блок."""
+        generator = self.generator
+        while self.index == len(self.times) and self.generated_until < generator.end:
+            end = (self.generated_until // generator.block + 1) * generator.block
+            self.times, self.origins, self.destinations = generator.generate(self.generated_until, end)
+            self.generated += len(self.times)
+            self.generated_until = end
+            self.index = 0
+        if self.index < len(self.times):
+            self.loop.call_at(self.times[self.index] - self.offset, self.arrival)
+
+    def arrival(self):
+        """Функция вызывает лифт для всех пассажиров, появившихся к текущему моменту."""
+        now = self.loop.now
+        times = self.times
+        limit = now + self.offset
+        index = self.index
+        while index < len(times) and times[index] <= limit:
+            self.call(self.origins[index], self.destinations[index], now, 0.0)
+            index += 1
+        self.index = index
+        self.plan()
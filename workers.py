@@ -0,0 +1,319 @@
+"""Управление лифтами через ограниченный набор потоков.
+Каждым лифтом управляет один долгоживущий поток, который получает команды
+(нажатия кнопок) из очереди и сам выполняет шаги движения лифта.
+Количество потоков равно количеству лифтов и не зависит от частоты вызовов,
+а состояние каждого лифта изменяется только из его собственного потока.
+Система синхронизации выбирает лифт для вызова в потоке, нажавшем кнопку,
+по согласованному снимку состояния лифтов (Dispatcher.snapshot) без общей блокировки.
+Функция stress_test проверяет, что при нажатии кнопок из многих потоков
+одновременно ни один вызов не теряется. Функция direct_stress_test проверяет
+то же без потоков управления: кнопки лифтов нажимаются напрямую из многих
+потоков, и каждый поток сам ведет лифт, который привел в движение, поэтому
+изменения состояния одного лифта из разных потоков соперничают за его блокировку.
+При запуске скрипта задается количество этажей в здании и количество лифтов,
+после чего работа лифтов моделируется в реальном времени.
+"""
+
+from threading import Thread
+from queue import Queue, Empty
+import time
+import random
+import traceback
+
+from multi_elevator_algorithm import Dispatcher, Elevator, random_outside_button
+from event_log import ConsoleEventLog
+from metrics import Hooks
+
+
+class ElevatorWorker(Thread):
+    """Поток, управляющий одним лифтом."""
+
+    def __init__(self, elevator):
+        """При инициализации указывается лифт. Продолжительность каждого действия
+        лифта умножается на масштаб времени системы синхронизации (Dispatcher.time_scale)."""
+        super().__init__(name=f'Elevator-{elevator.id}', daemon=True)
+        self.elevator = elevator
+        self.commands = Queue()  # Элементы - (функция, аргументы); None - завершение работы
+        self.timer = None  # Запланированный шаг движения лифта: (время, функция, аргументы)
+        self.processed = 0  # Количество обработанных команд
+        self.errors = 0  # Количество команд и шагов движения, завершившихся исключением
+        elevator.loop = self  # Шаги движения лифта планируются через этот поток
+
+    def submit(self, callback, *args):
+        """Функция передает потоку команду для выполнения."""
+        self.commands.put((callback, args))
+
+    def schedule(self, delay, callback, *args):
+        """Функция планирует шаг движения лифта через delay секунд.
+        Вызывается самим лифтом из потока управления."""
+        self.timer = (time.monotonic() + delay * self.elevator.dispatcher.time_scale, callback, args)
+
+    def run(self):
+        """Функция обрабатывает команды из очереди, а в перерывах между ними
+        выполняет запланированные шаги движения лифта. Наступивший шаг движения
+        выполняется раньше следующей команды, поэтому лифт движется, даже пока
+        в очереди есть команды."""
+        while True:
+            if self.timer is not None and self.timer[0] <= time.monotonic():
+                _, callback, args = self.timer
+                self.timer = None
+                self.execute(callback, args)
+                continue
+            if self.timer is None:
+                timeout = None  # Лифт стоит - ожидание следующей команды
+            else:
+                timeout = max(0, self.timer[0] - time.monotonic())
+            try:
+                command = self.commands.get(timeout=timeout)
+            except Empty:  # Наступило время очередного шага движения
+                continue
+            if command is None:
+                self.commands.task_done()
+                break
+            callback, args = command
+            try:
+                self.execute(callback, args)
+            finally:
+                self.processed += 1
+                self.commands.task_done()
+
+    def execute(self, callback, args):
+        """Функция выполняет команду или шаг движения лифта. Исключение выводится
+        в консоль и не завершает поток: иначе лифт перестал бы обрабатывать команды,
+        а WorkerPool.join ждал бы их обработки бесконечно."""
+        try:
+            callback(*args)
+        except Exception:
+            self.errors += 1
+            traceback.print_exc()
+
+    def shutdown(self):
+        """Функция завершает работу потока после обработки полученных команд."""
+        self.commands.put(None)
+
+
+class WorkerPool:
+    """Класс распределяет нажатия кнопок между потоками управления лифтами."""
+
+    def __init__(self, dispatcher, time_scale=None):
+        """При инициализации для каждого лифта системы синхронизации
+        создается отдельный поток управления. Если указан масштаб времени time_scale,
+        он устанавливается системе синхронизации (Dispatcher.time_scale)."""
+        self.dispatcher = dispatcher
+        if time_scale is not None:
+            dispatcher.time_scale = time_scale
+        self.workers = [ElevatorWorker(elevator) for elevator in dispatcher.elevators]
+
+    def start(self):
+        """Функция запускает потоки управления лифтами."""
+        for worker in self.workers:
+            worker.start()
+
+    def press_inside_button(self, obj_id, floor):
+        """Функция передает нажатие кнопки в кабине потоку управления лифтом."""
+        worker = self.workers[obj_id]
+        worker.submit(worker.elevator.press_inside_button, floor)
+
+    def press_outside_button(self, floor, speed):
+        """Функция выбирает ближайший к месту вызова лифт (см. Dispatcher.dispatch)
+        и передает вызов потоку управления этим лифтом."""
+        worker = self.workers[self.dispatcher.dispatch(floor, speed)]
+        worker.submit(worker.elevator.press_outside_button, floor, speed)
+
+    def join(self):
+        """Функция ожидает обработки всех переданных команд."""
+        for worker in self.workers:
+            worker.commands.join()
+
+    def wait_idle(self, poll=0.001):
+        """Функция ожидает, пока все команды не будут обработаны, а все лифты не остановятся."""
+        self.join()
+        while any(worker.elevator.moving or worker.commands.unfinished_tasks for worker in self.workers):
+            time.sleep(poll)
+
+    def shutdown(self):
+        """Функция завершает работу всех потоков управления лифтами."""
+        for worker in self.workers:
+            worker.shutdown()
+        for worker in self.workers:
+            worker.join()
+
+    def processed(self):
+        """Функция возвращает общее количество обработанных команд."""
+        return sum(worker.processed for worker in self.workers)
+
+
+def random_calls(pool):
+    """Функция имитирует нажатие кнопок в кабинах и на этажах пассажирами.
+    Нажатие случайной кнопки происходит каждые 2-3 секунды."""
+    dispatcher = pool.dispatcher
+    print('Random function for buttons started.')
+    while True:
+        time.sleep(random.randint(2, 3))
+        pool.press_inside_button(random.randrange(len(dispatcher.elevators)),
+                                 random.randint(1, dispatcher.n_floors))
+        pool.press_outside_button(*random_outside_button(dispatcher.n_floors))
+
+
+def measure_throughput(n_floors, n_elevators, n_calls, time_scale=0.001, seed=None):
+    """Функция измеряет пропускную способность потоков управления лифтами:
+    передает n_calls случайных нажатий кнопок без пауз и возвращает
+    количество обработанных вызовов в секунду. Лифты в это время движутся:
+    шаги движения выполняются между командами."""
+    rng = random.Random(seed)
+    dispatcher = Dispatcher(n_floors)
+    for _ in range(n_elevators):
+        Elevator(n_floors, dispatcher)
+    pool = WorkerPool(dispatcher, time_scale)
+    pool.start()
+
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        if rng.random() < 0.5:
+            pool.press_inside_button(rng.randrange(n_elevators), rng.randint(1, n_floors))
+        else:
+            pool.press_outside_button(*random_outside_button(n_floors, rng))
+    pool.join()
+    elapsed = time.perf_counter() - start
+
+    pool.shutdown()
+    return pool.processed() / elapsed
+
+
+class PressCounter(Hooks):
+    """Обработчик событий, подсчитывающий нажатия кнопок, полученные каждым лифтом,
+    и запоминающий кнопки, которые нажаты, но еще не обслужены закрытием дверей
+    на их этаже. Кнопка, нажатие которой потеряно при одновременном изменении
+    лифта из нескольких потоков, так и останется необслуженной.
+    Обработчики вызываются под блокировкой лифта, поэтому данные лифта
+    не изменяются из двух потоков одновременно."""
+
+    def __init__(self, dispatcher):
+        self.pressed = [0] * len(dispatcher.elevators)
+        # id лифта -> {(этаж, направление)}, направление 0 - кнопка в кабине:
+        self.waiting = [set() for _ in dispatcher.elevators]
+        dispatcher.hooks.append(self)
+
+    def on_press_inside(self, elevator, floor):
+        self.pressed[elevator.id] += 1
+        self.waiting[elevator.id].add((floor, 0))
+
+    def on_press_outside(self, elevator, floor, direction):
+        self.pressed[elevator.id] += 1
+        self.waiting[elevator.id].add((floor, direction))
+
+    def on_doors_closed(self, elevator, buttons):
+        if buttons is elevator.inside_buttons:
+            direction = 0
+        else:
+            direction = 1 if buttons is elevator.outside_buttons_up else -1
+        self.waiting[elevator.id].discard((elevator.cur_floor, direction))
+
+    def unserved(self):
+        """Функция возвращает количество нажатых и не обслуженных кнопок."""
+        return sum(len(waiting) for waiting in self.waiting)
+
+
+def stress_test(n_floors, n_elevators, n_threads, calls_per_thread, time_scale=0.0001, seed=None):
+    """Функция нажимает случайные кнопки в кабинах и на этажах одновременно
+    из n_threads потоков (по calls_per_thread нажатий из каждого) и дожидается
+    остановки всех лифтов. Возвращает словарь с количеством нажатий, полученных
+    лифтами (received), нажатых кнопок, оставшихся после остановки лифтов (pending),
+    нажатых кнопок, по которым лифты так и не открыли двери (unserved), и количеством
+    нажатий в секунду (calls_per_sec). Ни одно нажатие не потеряно, если received
+    равно calls, а pending и unserved равны 0."""
+    dispatcher = Dispatcher(n_floors)
+    for _ in range(n_elevators):
+        Elevator(n_floors, dispatcher)
+    counter = PressCounter(dispatcher)
+    pool = WorkerPool(dispatcher, time_scale)
+    pool.start()
+
+    def press_buttons(rng):
+        for _ in range(calls_per_thread):
+            if rng.random() < 0.5:
+                pool.press_inside_button(rng.randrange(n_elevators), rng.randint(1, n_floors))
+            else:
+                pool.press_outside_button(*random_outside_button(n_floors, rng))
+
+    rng = random.Random(seed)
+    threads = [Thread(target=press_buttons, args=(random.Random(rng.random()),))
+               for _ in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.join()
+    elapsed = time.perf_counter() - start
+
+    pool.wait_idle()
+    pool.shutdown()
+    n_calls = n_threads * calls_per_thread
+    return {'threads': n_threads, 'calls': n_calls, 'received': sum(counter.pressed),
+            'pending': pending_calls(dispatcher), 'unserved': counter.unserved(),
+            'calls_per_sec': n_calls / elapsed}
+
+
+def pending_calls(dispatcher):
+    """Функция возвращает количество нажатых и еще не обслуженных кнопок всех лифтов."""
+    return sum(buttons.count() for elevator in dispatcher.elevators
+               for buttons in (elevator.inside_buttons, elevator.outside_buttons_up,
+                               elevator.outside_buttons_down))
+
+
+def direct_stress_test(n_floors, n_elevators, n_threads, calls_per_thread, time_scale=0.0, seed=None):
+    """Функция нажимает случайные кнопки в кабинах и на этажах напрямую (Elevator.press_inside_button,
+    Dispatcher.press_outside_button) одновременно из n_threads потоков, по calls_per_thread
+    нажатий из каждого. Поток, нажатие которого привело лифт в движение, сам ведет лифт
+    до остановки с паузами, умноженными на time_scale, поэтому один и тот же лифт
+    изменяют несколько потоков. После завершения всех потоков каждое нажатие должно быть
+    получено лифтом, а каждый вызов - обслужен; иначе возникает исключение RuntimeError.
+    Возвращает словарь с теми же ключами, что stress_test."""
+    dispatcher = Dispatcher(n_floors)
+    dispatcher.time_scale = time_scale
+    for _ in range(n_elevators):
+        Elevator(n_floors, dispatcher)
+    counter = PressCounter(dispatcher)
+
+    def press_buttons(rng):
+        for _ in range(calls_per_thread):
+            if rng.random() < 0.5:
+                dispatcher.elevators[rng.randrange(n_elevators)].press_inside_button(rng.randint(1, n_floors))
+            else:
+                dispatcher.press_outside_button(*random_outside_button(n_floors, rng))
+
+    rng = random.Random(seed)
+    threads = [Thread(target=press_buttons, args=(random.Random(rng.random()),))
+               for _ in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    n_calls = n_threads * calls_per_thread
+    result = {'threads': n_threads, 'calls': n_calls, 'received': sum(counter.pressed),
+              'pending': pending_calls(dispatcher), 'unserved': counter.unserved(),
+              'calls_per_sec': n_calls / elapsed}
+    # Каждый поток завершается только после остановки лифта, который он вел,
+    # поэтому необслуженных вызовов остаться не должно:
+    moving = [elevator.id for elevator in dispatcher.elevators if elevator.moving]
+    if result['received'] != n_calls or result['pending'] or result['unserved'] or moving:
+        raise RuntimeError(f'Потеряны вызовы: {result}, лифты в движении: {moving}')
+    return result
+
+
+if __name__ == '__main__':
+    n_floors = int(input('Number of floors:\t'))
+    n_elevators = int(input('Number of elevators:\t'))
+
+    dispatcher = Dispatcher(n_floors, ConsoleEventLog())
+    for _ in range(n_elevators):
+        Elevator(n_floors, dispatcher)
+
+    pool = WorkerPool(dispatcher)
+    pool.start()
+
+    random_calls(pool)